@@ -0,0 +1,173 @@
+"""
+rough timing of the image processing parts, without GUI.
+run one part with `python benchmark.py <part>`, or every part without arguments.
+
+Example:
+ >>> python benchmark.py grid
+
+"""
+import os, subprocess, sys, tempfile, time
+
+import support_func as sf
+
+from PIL import Image
+
+def timeit(func, repeat:int=3) -> float:
+    "best seconds of repeat calls."
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def paste_grid(size, x, y, step, mark) -> Image.Image:
+    "the way grid was made before sf.tile_grid(), paste every watermark."
+    base = Image.new("RGBA", size)
+    locs = sf.grid_locations(x, y, step, size[0] + step, size[1] + step)
+    for x_loc in locs["x"]:
+        for y_loc in locs["y"]:
+            base.paste(im=mark, box=(x_loc, y_loc))
+    return base
+
+def bench_grid() -> None:
+    "grid layer of a 4000x3000 image, with around 1k, 10k and 100k watermarks."
+    size = (4000, 3000)
+    mark = Image.open("assets/img/watermark.png").convert("RGBA")
+    for cells in (1_000, 10_000, 100_000):
+        step = round((size[0] * size[1] / cells) ** 0.5)
+        small = mark.resize((step - 2, round((step - 2) * mark.height / mark.width)))
+
+        pasted = paste_grid(size, 37, 21, step, small)
+        tiled = sf.tile_grid(size, 37, 21, step, small)
+        same = pasted.tobytes() == tiled.tobytes()
+
+        paste_t = timeit(lambda: paste_grid(size, 37, 21, step, small))
+        tile_t = timeit(lambda: sf.tile_grid(size, 37, 21, step, small))
+        print(f"grid {cells:>7} cells: paste {paste_t * 1000:8.1f} ms, tile {tile_t * 1000:8.1f} ms, same pixels: {same}")
+
+def peak_rss() -> int:
+    "peak resident memory of this process in bytes, not available on windows."
+    # ru_maxrss of a child on linux starts from its parent's peak, VmHWM doesn't
+    if os.path.exists("/proc/self/status"):
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    import resource # unix only
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def memory_child(filepath:str, grid:str) -> None:
+    "render one image in a fresh process, print size of decoded frame and peak memory used by rendering."
+    mark = Image.open("assets/img/watermark.png").convert("RGBA")
+    spec = sf.MarkSpec(
+        mark=mark, mark_id="bench", alpha=200, scale=2, 
+        grid=grid == "grid", grid_space=20, position=(300, 200), 
+        canvas_size=(864, 564), canvas_pad=(30, 30), 
+    )
+    # warm up imports and caches with a small image, so only the big image is measured
+    sf.render("assets/img/200x200.png", spec)
+    before = peak_rss()
+    with Image.open(filepath) as image:
+        # pillow keeps RGB in 4 bytes per pixel, same as RGBA
+        frame = image.width * image.height * 4
+    sf.render_to_file(filepath, filepath + ".out.jpg", spec)
+    print(frame, peak_rss() - before)
+
+def bench_memory() -> None:
+    "peak memory of rendering a 48MP jpeg, compared to size of the decoded frame."
+    if sys.platform == "win32":
+        print("memory: skipped, peak memory is only measured on linux and macos.")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = os.path.join(tmp, "big.jpg")
+        Image.new("RGB", (8000, 6000), (90, 120, 150)).save(filepath)
+        for grid in ("single", "grid"):
+            out = subprocess.run(
+                [sys.executable, __file__, "memory_child", filepath, grid], 
+                capture_output=True, text=True, check=True, 
+            ).stdout.split()
+            frame, peak = int(out[0]), int(out[1])
+            print(f"memory {grid:>6}: frame {frame / 2**20:6.1f} MB, peak {peak / 2**20:6.1f} MB, {peak / frame:.2f}x frame")
+
+def bench_text() -> None:
+    "measure text on every key stroke, with a 2000x2000 scratch image and with sf.text_bbox()."
+    from matplotlib import font_manager
+    from PIL import ImageDraw
+
+    fnt = sf.font_cache.get(font_manager.findfont("DejaVu Sans"), 21.3)
+    text = "enter text as watermark"
+    count = 1000
+
+    def scratch():
+        for _ in range(count):
+            ImageDraw.Draw(Image.new("RGBA", (2000, 2000))).textbbox((0, 0), text, font=fnt)
+
+    def metrics():
+        for _ in range(count):
+            sf.text_bbox(text, fnt)
+
+    scratch_t = timeit(scratch) / count
+    metrics_t = timeit(metrics) / count
+    print(f"text bbox: scratch image {scratch_t * 1e6:8.1f} us, font metrics {metrics_t * 1e6:8.1f} us per key stroke")
+
+def bench_preview() -> None:
+    "grid preview layer at canvas size, made on every mouse motion, against one frame at 60 Hz."
+    size = (804, 504)
+    mark = Image.open("assets/img/watermark.png").convert("RGBA")
+    for width in (20, 60, 200):
+        small = mark.resize((width, round(width * mark.height / mark.width)))
+        step = width + 10
+        count = 200
+        sf.grid_layer(size, 0, 0, step, small, ("bench", width))
+
+        def motion():
+            for i in range(count):
+                sf.grid_layer(size, i * 3, i * 2, step, small, ("bench", width))
+
+        cells = len(range(0, size[0], step)) * len(range(0, size[1], step))
+        motion_t = timeit(motion) / count
+        print(f"grid preview {cells:>5} cells: {motion_t * 1000:6.2f} ms per motion, frame budget 16.7 ms")
+
+def bench_transform() -> None:
+    "rotate (nearest, pillow default) then resize, against rotate and resize in one bicubic affine transform by sf.transformed()."
+    mark = Image.open("assets/img/watermark.png").convert("RGBA")
+    for angle, scale in ((30, 0.3), (30, 1.5), (45, 4)):
+        width, height = sf.rotated_size(mark.size, angle)
+        size = round(width * scale), round(height * scale)
+        two_step_t = timeit(lambda: mark.rotate(angle, expand=True).resize(size), repeat=10)
+        fused_t = timeit(lambda: sf.transformed(mark, None, angle=angle, size=size), repeat=10)
+        print(f"transform {angle:>3} deg x{scale:<4}: rotate and resize {two_step_t * 1000:6.2f} ms, fused {fused_t * 1000:6.2f} ms")
+
+def bench_profiles() -> None:
+    "preview of a 6000x4000 image and a rotated watermark, rendered by each profile, without cached pyramid levels."
+    mark = Image.open("assets/img/watermark.png").convert("RGBA")
+    with tempfile.TemporaryDirectory() as tmp:
+        filepath = os.path.join(tmp, "big.png")
+        Image.new("RGB", (6000, 4000), (90, 120, 150)).save(filepath, compress_level=1)
+        for profile in (sf.interactive, sf.export):
+            def preview():
+                # otherwise only the first call decodes and resamples, the rest are cache lookups
+                sf.pyramids.clear()
+                sf.load_preview(filepath, (800, 500), profile)
+            
+            preview_t = timeit(preview)
+            mark_t = timeit(lambda: sf.transformed(mark, None, angle=30, size=(240, 190), profile=profile), repeat=10)
+            print(f"profile {profile.name:>11}: preview {preview_t * 1000:7.1f} ms, watermark {mark_t * 1000:6.2f} ms")
+
+parts = {
+    "grid": bench_grid,
+    "memory": bench_memory,
+    "text": bench_text,
+    "preview": bench_preview,
+    "transform": bench_transform,
+    "profiles": bench_profiles,
+}
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["memory_child"]:
+        memory_child(*sys.argv[2:])
+    else:
+        for name in sys.argv[1:] or parts:
+            parts[name]()
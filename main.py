@@ -1,10 +1,10 @@
 import tkinter as tk
 import numpy as np
-import math, os
+import math, os, threading, time
 
 import support_func as sf
 
-from PIL import Image, ImageDraw, ImageFont, ImageTk
+from PIL import Image, ImageDraw, ImageTk
 from tkinter import colorchooser, filedialog, messagebox, ttk
 
 from typing import Literal
@@ -24,7 +24,6 @@ canvas_pady = 30
 mark_width = 50
 mark_height = 50
 
-text_watermark_max_size = (2000, 2000)
 gray = (128, 128, 128)
 
 # border and offsets by eyeballing it
@@ -42,10 +41,27 @@ default_style = sorted(style)
 # file related stuff
 file_type = ((".png", "*.png"), (".jpg", "*.jpg"), (".jpeg", "*.jpeg"))
 
+# worker processes used by apply to folder
+max_workers = os.cpu_count() or 1
+batch_poll_ms = 100 # how often progress of apply to folder is updated
+font_poll_ms = 100 # how often fonts found in background are added to font combobox
+preview_fps = 60 # renders and mouse motion preview are drawn at most this many times per second
+
+# run with environment variable MARKIT_LATENCY=1 to print latency from mouse motion to preview painted
+log_latency = os.environ.get("MARKIT_LATENCY") == "1"
+latency_report_every = 120 # paints
+# run with environment variable MARKIT_STATS=1 to print startup time, and cache and render stats on exit
+log_stats = os.environ.get("MARKIT_STATS") == "1"
+
+# next images in queue loaded in background, so save moves on to them without waiting
+prefetch_depth = 2
+prefetch_max_bytes = 64 * 2**20
+
+save_queue_size = 4 # saves written in background, save waits for room when this many are waiting
+
 _state: TypeAlias = Literal["image", "text"]
 _color: TypeAlias = Literal["mark bg", "text", "canvas"]
 _img: TypeAlias = Literal["image", "mark", "text", "icon"]
-_loc: TypeAlias = Literal["image", "canvas"]
 _rstable: TypeAlias = Literal["rotate", "scale", "opaque", "grid", "advset"]
 _dft_key: TypeAlias = Literal["attr_name", "default_val"] # dft_key = default_key
 _ckbtn_switch: TypeAlias = Literal["format", "rename"]
@@ -66,6 +82,7 @@ class WaterMarker():
      
     """
     def __init__(self) -> None:
+        self.launch_time = time.perf_counter()
         self.window = tk.Tk()
         self.window.title("💧MarkIt.")
         self.window.geometry(f"{window_width}x{window_height}")
@@ -74,6 +91,13 @@ class WaterMarker():
         
         self.validator_spnbx = (self.window.register(self.spnbx_val_validate), "%P")
         self.tip = sf.TipManager()
+        # sliders, spinboxes and typing request renders, watermark is rebuilt once per frame
+        self.scheduler = sf.RenderScheduler(self.window, frame_ms=round(1000 / preview_fps))
+        self.prefetcher = sf.Prefetcher(depth=prefetch_depth, max_bytes=prefetch_max_bytes)
+        self.save_queue = sf.SaveQueue(max_pending=save_queue_size)
+        self.saves_polling = False
+        self.closing = False
+        self.window.protocol("WM_DELETE_WINDOW", self.on_close)
         
         self.setup_option()
         self.setup_attribute()
@@ -84,10 +108,18 @@ class WaterMarker():
         self.setup_rstble()
         
         self.window.update()
+        self.first_paint = time.perf_counter() - self.launch_time
+        if log_stats:
+            print(f"window painted in {self.first_paint:.2f}s")
         
         self.awake_custom()
         self.tip.enable_all()
         
+        # rest of the fonts are found after window shows up
+        self.font_scanner = sf.FontScanner()
+        self.font_scanner.start()
+        self.window.after(font_poll_ms, self.poll_fonts)
+        
         
     def setup_option(self) -> None:
         # must set before widgets are created, cite: https://tcl.tk/man/tcl8.6/TkCmd/option.html
@@ -122,14 +154,37 @@ class WaterMarker():
         self.current_font_hexcolor = "black"
         self.current_font_rgb:tuple[int,int,int] = (0, 0, 0)
         
-        self.fonts_dict:dict[str, dict[str, str]] = sf.get_sysfont_sorted()
+        # only default font is looked up here, others are added by self.poll_fonts()
+        self.fonts_dict:dict[str, dict[str, str]] = sf.find_font(default_font)
         self.font_names:list[str] = sorted(list(self.fonts_dict.keys()))
         
-        self.grid_watermark:list[int] = []
-        self.grid_watermark_preview:list[int] = []
+        # canvas items of watermark and preview, moved around instead of created on every motion
+        self.mark_items:list[int] = []
+        self.preview_items:list[int] = []
+        self.items_image:dict[str, ImageTk.PhotoImage|None] = {'clicked': None, 'motion': None}
+        self.placed_position:tuple[int, int] = (0, 0) # where user last clicked, mouse motion doesn't change it
+        # one PhotoImage for image, watermark and each grid layer, updated in place
+        self.surfaces = sf.PhotoSurfaces()
+        self.grid_draw_ms:float = 0
+        self.grid_draw_worst_ms:float = 0
+        
+        # only the latest mouse motion is drawn, once per frame
+        self.motion_event:tk.Event|None = None
+        self.motion_since:float|None = None # when the first not yet drawn motion came
+        self.motion_latency = sf.LatencyLog("motion to paint") if log_latency else None
+        
+        # zoom mode, canvas shows tiles of watermarked image, level 0 is 100%
+        self.viewer:sf.TileRenderer|None = None
+        self.zoom_level = 0
+        self.view_x = self.view_y = 0 # top left of canvas in pixels of current level
+        self.tile_items:dict[tuple[int, int], tuple[int, ImageTk.PhotoImage]] = {}
+        self.pan_start = (0, 0, 0, 0)
         
         self.apply_paths:list[str] = []
         
+        self.batch_thread:threading.Thread|None = None
+        self.batch_cancel = threading.Event()
+        
     def setup_variable(self) -> None:
         """
         create every variable for widgets.
@@ -180,11 +235,18 @@ class WaterMarker():
         self.fname_name.set("Name")
         self.fname_example = tk.StringVar()
         
+        self.usrntr_workers = tk.IntVar()
+        self.usrntr_workers.set(max_workers)
+        
+        self.batch_status = tk.StringVar()
+        self.save_status = tk.StringVar()
+        
         # checkbutton variables, set value after checkbutton is created
         self.ckbtnvr_grid = tk.BooleanVar()
         self.ckbtnvr_show_preview = tk.BooleanVar()
         self.ckbtnvr_snap = tk.BooleanVar()
         self.ckbtnvr_show_cnvs_bg = tk.BooleanVar()
+        self.ckbtnvr_zoom = tk.BooleanVar()
         self.ckbtnvr_show_mark_bg = tk.BooleanVar()
         self.ckbtnvr_wrng_mark_bg = tk.BooleanVar(value=True)
         self.ckbtnvr_fname_fmt = tk.BooleanVar(value=True)
@@ -382,6 +444,23 @@ class WaterMarker():
             side="tr", 
         )
         
+        self.ckbtnbrdr_zoom = tk.Frame(self.block_cnvs_ctrl, bg="light gray")
+        self.ckbtn_zoom = tk.Checkbutton(
+            self.ckbtnbrdr_zoom, 
+            text="zoom", 
+            variable=self.ckbtnvr_zoom,
+            command=self.update_zoom,
+            bg='white', 
+            )
+        self.ckbtn_zoom.deselect()
+        self.ckbtn_zoom.pack(padx=1, pady=1)
+        self.ckbtnbrdr_zoom.grid(column=4, row=0)
+        self.tip.add_to_queue(
+            self.ckbtn_zoom, 
+            text='check the result at full resolution, starts at 100%,\nscroll to zoom, drag to move around.', 
+            side="tr", 
+        )
+        
         # block switch
         self.btn_switch_image = tk.Button(self.block_switch, text="image", command=self.btnf_image_mode)
         self.btn_switch_image.grid(column=0, row=0, padx=2, pady=2)
@@ -409,6 +488,9 @@ class WaterMarker():
             side="bl"
         )
         
+        self.lbl_save_status = tk.Label(self.block_save, textvariable=self.save_status, bg="white")
+        self.lbl_save_status.grid(column=2, row=0, padx=2, pady=2)
+        
         # block text
         row = 0
         self.lbl_text = tk.Label(self.block_text, text="text", bg='white')
@@ -468,12 +550,12 @@ class WaterMarker():
         self.spnbx_fontsize = tk.Spinbox(
             self.block_text, 
             from_=3, to=216, 
-            command=self.text_mark_maker, 
+            command=self.scheduler.wrap(self.text_mark_maker), 
             textvariable=self.usrntr_fontsize, 
             validate="key", validatecommand=self.validator_spnbx, 
             width=4
             )
-        self.spnbx_fontsize.bind("<KeyRelease>", self.text_mark_maker)
+        self.spnbx_fontsize.bind("<KeyRelease>", self.scheduler.wrap(self.text_mark_maker))
         self.spnbx_fontsize.grid(column=1, row=row, padx=(210, 0), sticky='w')
         
         self.btn_color = tk.Button(
@@ -505,11 +587,11 @@ class WaterMarker():
             from_=0, to=360, 
             increment=45,
             textvariable=self.usrntr_rotate, 
-            command=self.update_userequest, 
+            command=self.scheduler.wrap(self.update_userequest), 
             validate="key", validatecommand=self.validator_spnbx, 
             wrap=True, width=8, 
             )
-        self.spnbx_rotate.bind("<KeyRelease>", self.text_mark_maker)
+        self.spnbx_rotate.bind("<KeyRelease>", self.scheduler.wrap(self.text_mark_maker))
         self.spnbx_rotate.grid(column=1, row=row)
         
         self.btnrst_rotate = tk.Button(
@@ -539,7 +621,7 @@ class WaterMarker():
             tickinterval=0.1, 
             variable=self.tick_scale, 
             cz_variable = self.tick_scale, 
-            cmd=self.update_userequest,
+            cmd=self.scheduler.wrap(self.update_userequest),
             length=110, width=10, 
             orient='horizontal', bg='white', 
             )
@@ -572,7 +654,7 @@ class WaterMarker():
             self.block_panel, 
             from_=0, to=100, 
             variable=self.usrntr_opaque, 
-            command=self.update_userequest, 
+            command=self.scheduler.wrap(self.update_userequest), 
             orient='horizontal', 
             length=110, width=10, bg='white', 
             )
@@ -595,7 +677,7 @@ class WaterMarker():
             self.ckbtnbrdr_grid, 
             text="grid", 
             variable=self.ckbtnvr_grid, 
-            command=self.update_userequest, 
+            command=self.scheduler.wrap(self.update_userequest), 
             bg='white'
             )
         self.ckbtn_grid.grid(padx=1, pady=1)
@@ -613,7 +695,7 @@ class WaterMarker():
             tickinterval=0.1, 
             variable=self.tick_grid, 
             cz_variable=self.tick_grid, 
-            cmd=self.update_userequest, 
+            cmd=self.scheduler.wrap(self.update_userequest), 
             no_symbol=True, 
             length=110, width=10, 
             orient='horizontal', bg='white' 
@@ -804,7 +886,7 @@ class WaterMarker():
         self.spnbx_mark_w = sf.CustomSpinbox(
             self.tplvl_advset, 
             from_=-200, to=200, 
-            cmd=self.text_mark_maker, 
+            cmd=self.scheduler.wrap(self.text_mark_maker), 
             textvariable=self.usrntr_border_w, 
             cz_variable=self.usrntr_border_w, 
             validate="key", validatecommand=self.validator_spnbx, 
@@ -829,7 +911,7 @@ class WaterMarker():
         self.spnbx_mark_h = sf.CustomSpinbox(
             self.tplvl_advset, 
             from_=-200, to=200, 
-            cmd=self.text_mark_maker, 
+            cmd=self.scheduler.wrap(self.text_mark_maker), 
             textvariable=self.usrntr_border_h, 
             cz_variable=self.usrntr_border_h, 
             validate="key", validatecommand=self.validator_spnbx, 
@@ -854,7 +936,7 @@ class WaterMarker():
         self.spnbx_offset_h = sf.CustomSpinbox(
             self.tplvl_advset, 
             from_=-200, to=200, 
-            cmd=self.text_mark_maker, 
+            cmd=self.scheduler.wrap(self.text_mark_maker), 
             textvariable=self.usrntr_offset_w, 
             cz_variable=self.usrntr_offset_w, 
             validate="key", validatecommand=self.validator_spnbx, 
@@ -879,7 +961,7 @@ class WaterMarker():
         self.spnbx_offset_v = sf.CustomSpinbox(
             self.tplvl_advset, 
             from_=-200, to=200, 
-            cmd=self.text_mark_maker, 
+            cmd=self.scheduler.wrap(self.text_mark_maker), 
             textvariable=self.usrntr_offset_h, 
             cz_variable=self.usrntr_offset_h, 
             validate="key", validatecommand=self.validator_spnbx, 
@@ -904,7 +986,7 @@ class WaterMarker():
         self.spnbx_shift_h = sf.CustomSpinbox(
             self.tplvl_advset, 
             from_=-200, to=200, 
-            cmd=self.text_mark_maker, 
+            cmd=self.scheduler.wrap(self.text_mark_maker), 
             textvariable=self.usrntr_shift_h, 
             cz_variable=self.usrntr_shift_h, 
             validate="key", validatecommand=self.validator_spnbx, 
@@ -929,7 +1011,7 @@ class WaterMarker():
         self.spnbx_shift_v = sf.CustomSpinbox(
             self.tplvl_advset, 
             from_=-200, to=200, 
-            cmd=self.text_mark_maker, 
+            cmd=self.scheduler.wrap(self.text_mark_maker), 
             textvariable=self.usrntr_shift_v, 
             cz_variable=self.usrntr_shift_v, 
             validate="key", validatecommand=self.validator_spnbx, 
@@ -1156,6 +1238,49 @@ class WaterMarker():
         self.lbl_outcome_fname.grid(column=1, row=row, pady=7, columnspan=3, sticky='w')
         
         row = 5
+        self.lbl_workers = tk.Label(
+            self.tplvl_save, 
+            text="workers", 
+            bg="white", 
+        )
+        self.lbl_workers.grid(column=0, row=row, sticky='w')
+        self.tip.add_to_queue(
+            self.lbl_workers, 
+            text="number of images processed at the same time,\nuse 1 to process one image after another."
+        )
+        
+        self.spnbx_workers = tk.Spinbox(
+            self.tplvl_save, 
+            from_=1, to=max_workers, 
+            textvariable=self.usrntr_workers, 
+            validate="key", validatecommand=self.validator_spnbx, 
+            width=4
+        )
+        self.spnbx_workers.grid(column=1, row=row, sticky='w')
+        
+        row = 6
+        self.lbl_profile = tk.Label(
+            self.tplvl_save, 
+            text="quality", 
+            bg="white", 
+        )
+        self.lbl_profile.grid(column=0, row=row, sticky='w')
+        self.tip.add_to_queue(
+            self.lbl_profile, 
+            text="export: best resampling for saved images,\ninteractive: faster and rougher, like the canvas."
+        )
+        
+        self.cmbbx_profile = ttk.Combobox(
+            self.tplvl_save, 
+            values=list(sf.profiles), 
+            state="readonly", 
+            cursor="hand2", 
+            width=10, 
+        )
+        self.cmbbx_profile.set(sf.export.name)
+        self.cmbbx_profile.grid(column=1, row=row, columnspan=2, sticky='w')
+        
+        row = 7
         self.btn_apply_savefmt = tk.Button(
             self.tplvl_save, 
             text="execute", 
@@ -1167,6 +1292,34 @@ class WaterMarker():
             text="add watermark to all images selected,\nsave images by naming scheme above."
         )
         
+        self.btn_cancel_batch = tk.Button(
+            self.tplvl_save, 
+            text="cancel", 
+            command=self.btnf_cancel_batch, 
+            state="disabled", 
+        )
+        self.btn_cancel_batch.grid(column=2, row=row)
+        self.tip.add_to_queue(
+            self.btn_cancel_batch, 
+            text="stop adding watermark after current images,\nimages already saved will be kept."
+        )
+        
+        row = 8
+        self.pgbr_batch = ttk.Progressbar(
+            self.tplvl_save, 
+            orient="horizontal", 
+            mode="determinate", 
+        )
+        self.pgbr_batch.grid(column=0, row=row, columnspan=3, pady=(7, 0), sticky='we')
+        
+        row = 9
+        self.lbl_batch_status = tk.Label(
+            self.tplvl_save, 
+            textvariable=self.batch_status, 
+            bg="white", 
+        )
+        self.lbl_batch_status.grid(column=0, row=row, columnspan=3, sticky='w')
+        
     # GUI functions
     def btnf_load_image_path(self):
         self.filepath_image = "assets/img/200x200.png"
@@ -1285,6 +1438,11 @@ class WaterMarker():
         self.lbl_savedir.config(fg="black")
         self.tplvl_save.deiconify()
     
+    def btnf_cancel_batch(self) -> None:
+        self.batch_cancel.set()
+        self.batch_status.set("cancelling, waiting for current images...")
+        self.btn_cancel_batch.config(state="disabled")
+    
     def btnf_ckbtn_tooltip(self) -> None:
         if self.ckbtnvr_tooltip.get():
             self.tip.enable_all()
@@ -1302,15 +1460,26 @@ class WaterMarker():
         
     def reset_usrntr(self, func:_rstable) -> None:
         if func == "advset":
-            for idx, value in enumerate(self.rstble_vals[func]["attr_name"]): # type: ignore
-                value.set(self.rstble_vals[func]["default_val"][idx]) # type: ignore
+            attrs = self.rstble_vals[func]["attr_name"]
+            defaults = self.rstble_vals[func]["default_val"]
+            values = dict(zip(attrs, defaults)) # type: ignore
         else:
-            self.rstble_vals[func]["attr_name"].set( # type: ignore
-                self.rstble_vals[func].get("default_val")
-            )
-        for widget in self.standby_widget:
-            widget.command()
-        self.update_userequest()
+            values = {self.rstble_vals[func]["attr_name"]: self.rstble_vals[func]["default_val"]}
+        self.set_usrntr(values) # type: ignore
+    
+    def set_usrntr(self, values:dict[tk.Variable, object]) -> None:
+        """
+        set any number of user entered values, and rebuild watermark only once,
+        use this for resets, presets or any change not made by user.
+
+        Args:
+            values (dict[tk.Variable, object]): {variable: value to set, ...}
+        """
+        with self.scheduler.transaction(self.update_userequest):
+            for variable, value in values.items():
+                variable.set(value) # type: ignore
+            for widget in self.standby_widget:
+                widget.command()
         
     def font_selected(self, event=None) -> None:
         rq_font = self.cmbbx_font.get()
@@ -1345,11 +1514,13 @@ class WaterMarker():
         filename = self.get_fname()
         self.fname_example.set(filename)
         
-    def get_fname(self, idx:int|None=None) -> str:
+    def get_fname(self, idx:int|None=None, filepath:str|None=None) -> str:
+        if filepath is None:
+            filepath = self.filepath_image
         if self.ckbtnvr_fname_fmt.get():
             prefix = self.fname_prefix.get()
             suffix = self.fname_suffix.get()
-            og_name = self.filepath_image.rsplit("/", maxsplit=1)[1].rsplit(".", maxsplit=1)[-2]
+            og_name = filepath.rsplit("/", maxsplit=1)[1].rsplit(".", maxsplit=1)[-2]
             fname = prefix + og_name + suffix
         else:
             name = self.fname_name.get()
@@ -1360,6 +1531,27 @@ class WaterMarker():
         fmt = self.cmbbx_filefmt.get()
         return fname + fmt
         
+    def poll_fonts(self) -> None:
+        """
+        add fonts found by the background font scanner to font combobox, 
+        until every font is found.
+        """
+        added = False
+        while not self.font_scanner.found.empty():
+            font_name, style, file_name = self.font_scanner.found.get_nowait()
+            if font_name not in self.fonts_dict:
+                self.fonts_dict[font_name] = {}
+                added = True
+            self.fonts_dict[font_name][style] = file_name
+        if added:
+            self.font_names = sorted(list(self.fonts_dict.keys()))
+            self.cmbbx_font['values'] = self.font_names
+        
+        if self.font_scanner.is_alive() or not self.font_scanner.found.empty():
+            self.window.after(font_poll_ms, self.poll_fonts)
+        elif log_stats:
+            print(f"{len(self.font_names)} fonts found in {self.font_scanner.elapsed:.2f}s")
+    
     def show_hidden_widget(self) -> None:
         if self.ckbtnvr_show_mark_bg.get():
             self.ckbtnbrdr_wrng_mark_bg.grid(column=0, row=1, columnspan=2)
@@ -1372,6 +1564,36 @@ class WaterMarker():
         the power button.
         """
         self.window.mainloop()
+        self.prefetcher.close()
+        # in case window is closed without self.on_close()
+        self.save_queue.flush()
+        for path, error in self.save_queue.take_errors():
+            print(f"not saved, {path}: {error}")
+        if log_stats:
+            self.print_cache_stats()
+    
+    def on_close(self) -> None:
+        "close window after every save in background is written."
+        if self.save_queue.pending == 0:
+            self.window.destroy()
+            return None
+        self.closing = True
+        self.btn_save.config(state="disabled")
+        self.poll_saves()
+    
+    def print_cache_stats(self) -> None:
+        "print hit rate of caches, to see how often decoding and rendering is skipped."
+        print(sf.mark_sources)
+        print(sf.renditions)
+        print(sf.pyramids)
+        print(sf.font_cache)
+        print(self.scheduler)
+        print(self.surfaces)
+        print(self.prefetcher)
+        print(sf.profile_timing)
+        print(f"grid preview: last drawn in {self.grid_draw_ms:.1f} ms, worst {self.grid_draw_worst_ms:.1f} ms.")
+        if self.motion_latency is not None:
+            print(self.motion_latency)
         
     def usrntr_text(self) -> str:
         return self.tktxt_entry.get(0.0, "end-1c")
@@ -1404,17 +1626,27 @@ class WaterMarker():
         # // load image and convert it to RGBA, to avoid ValueError: images do not match
         # // cite: https://stackoverflow.com/questions/12291641/python-pil-valueerror-images-do-not-match
         # when using Image.alpha_composite(), alpha channel are of course necessary.
-        image_pil = Image.open(filepath).convert("RGBA")
-        
-        
-        if alpha:
-            image_pil.putalpha(alpha)
-        image_pil = image_pil.rotate(angle, expand=True)
+        if type_ == 'mark':
+            # watermark is decoded once and reused on every rotate, scale or opaque change,
+            # renditions are cached, keep the untouched source for rendering output
+            self.mark_source = sf.mark_sources.get(filepath)
+            self.mark_id = sf.mark_sources.key(filepath)
+            self.mark_angle, self.mark_alpha = angle, alpha
+            # only size of rotated watermark is needed, it's rotated and resized in one go below
+            self.mark_rotated_size = sf.rotated_size(self.mark_source.size, angle)
+            
+            size = self.get_image_size(self.mark_rotated_size, type_=type_, max_size=max_size)
+            img = sf.transformed(
+                self.mark_source, self.mark_id, angle=angle, alpha=alpha, size=size, profile=sf.interactive
+                )
+            self.mark_display = img
+            return self.surfaces.show("mark", img)
         
+        image_pil = Image.open(filepath).convert("RGBA")
         self.store_pil(pil=image_pil, type_=type_)
         
-        size = self.get_image_size(pil=image_pil, type_=type_, max_size=max_size)
-        img = image_pil.resize(size)
+        size = self.get_image_size(sf.rotated_size(image_pil.size, angle), type_=type_, max_size=max_size)
+        img = sf.transformed(image_pil, None, angle=angle, alpha=alpha, size=size, profile=sf.interactive)
         
         return ImageTk.PhotoImage(img)
     
@@ -1423,12 +1655,26 @@ class WaterMarker():
         ask user filepath to load image,
         create the image on canvas and remove default(place holder) image.
         """
+        if self.viewer is not None:
+            self.ckbtnvr_zoom.set(False)
+            self.exit_zoom()
         # remove previous image
         if self.is_image:
             self.canvas.delete(self.canvas_image)
-        self.image = self.proper_load(filepath=self.filepath_image, type_='image')
-        self.image_width_scale = self.image_pil.width / self.image.width()
-        self.image_height_scale = self.image_pil.height / self.image.height()
+        # preview is decoded near canvas size, full resolution is decoded only when saving
+        bound = (
+            self.canvas.winfo_reqwidth() - canvas_padx * 2, 
+            self.canvas.winfo_reqheight() - canvas_pady * 2, 
+        )
+        loaded = self.prefetcher.take(self.filepath_image, bound)
+        if loaded is None:
+            loaded = sf.load_preview(self.filepath_image, bound)
+        preview, self.image_size = loaded
+        # load the ones after it while user is placing watermark
+        self.prefetcher.want([path for path in self.apply_paths if path != self.filepath_image], bound)
+        self.image = self.surfaces.show("image", preview)
+        self.image_width_scale = self.image_size[0] / self.image.width()
+        self.image_height_scale = self.image_size[1] / self.image.height()
         
         # calculate where datum's(top left corner of image) position will be in the canvas.
         self.image_datum_x = math.floor((self.canvas.winfo_reqwidth() - self.image.width()) / 2)
@@ -1436,6 +1682,8 @@ class WaterMarker():
         
         # create image in canvas position at datum.
         self.canvas_image = self.canvas.create_image(self.image_datum_x, self.image_datum_y, image=self.image, anchor='nw')
+        # watermark items are kept and moved, keep them above the new image
+        self.canvas.tag_lower(self.canvas_image)
         
         self.is_image = True
         self.clicked = False
@@ -1469,6 +1717,7 @@ class WaterMarker():
         
         # update preview
         self.lbl_watermark_preview.config(image=self.mark) # type: ignore
+        self.refresh_zoom()
     
     def canvas_action(self, event, *, method:str, call_by_func:bool|None=None) -> None:
         """
@@ -1479,13 +1728,8 @@ class WaterMarker():
             event (_type_): _description_ 
             method (str): user action on canvas, 'clicked' or 'motion'.
         """
-        try:
-            self.remove_exist_watermark(method=method)
-        except AttributeError:
-            print("first time only AttributeError, no worries.")
-            
         if call_by_func:
-            x0, y0 = self.clicked_position
+            x0, y0 = self.placed_position
         else:
             x0, y0 = event.x, event.y
         self.clicked_position = x0, y0
@@ -1494,6 +1738,7 @@ class WaterMarker():
         
         if method == 'clicked':
             self.clicked = True
+            self.placed_position = x0, y0
             if self.ckbtnvr_snap.get() and snap_position:
                 self.true_position:tuple[int,int] = snap_position
                 self.snap_position:bool = True
@@ -1502,31 +1747,92 @@ class WaterMarker():
                 self.snap_position:bool = False
         
         if self.ckbtnvr_grid.get():
-            grid_space = self.usrntr_grid.get()
-            locs = self.grid_calculate(x, y, grid_space, on="canvas")
-            for x_loc in locs["x"]:
-                for y_loc in locs["y"]:
-                    self.draw_watermark(x_loc, y_loc, method=method, grid=True)
+            self.draw_grid(x, y, method=method)
         else:
-            self.draw_watermark(x, y, method=method)
+            self.draw_watermark([(x, y)], method=method)
+        
+    def motion_action(self, event:tk.Event) -> None:
+        """
+        keep only the latest mouse position, preview is drawn by self.motion_render() once per frame.
+        """
+        self.motion_event = event
+        if self.motion_since is None:
+            self.motion_since = time.perf_counter()
+        self.scheduler.request(self.motion_render)
+        
+    def motion_render(self) -> None:
+        "draw preview at the latest mouse position."
+        event, since = self.motion_event, self.motion_since
+        self.motion_event = self.motion_since = None
+        # preview may be turned off after the motion
+        if event is None or not self.ckbtnvr_show_preview.get():
+            return None
+        self.canvas_action(event, method='motion')
+        
+        if self.motion_latency is not None and since is not None:
+            # canvas redraws when idle, this idle callback is queued after it
+            self.canvas.after_idle(self.record_latency, since)
+        
+    def record_latency(self, since:float) -> None:
+        log:sf.LatencyLog = self.motion_latency # type: ignore
+        log.record(time.perf_counter() - since)
+        if log.count % latency_report_every == 0:
+            print(log)
+        
+    def draw_grid(self, x:int, y:int, method:str) -> None:
+        """
+        draw grid of watermark aligned with (x, y) in canvas, 
+        as one layer clipped to the image, instead of one canvas item per watermark.
+        the layer is kept in one PhotoImage and updated in place.
+
+        Args:
+            x (int): x of one of the watermark in canvas.
+            y (int): y of one of the watermark in canvas.
+            method (str): user action, 'clicked' or 'motion'.
+        """
+        start = time.perf_counter()
+        size = self.image.width(), self.image.height()
+        step = max(self.mark.width(), self.mark.height()) + self.usrntr_grid.get()
+        mark_id = self.mark_id, self.mark_angle, self.mark_alpha, self.mark_display.size
+        layer = sf.grid_layer(
+            size, x - self.image_datum_x, y - self.image_datum_y, step, self.mark_display, mark_id
+            )
         
-    def draw_watermark(self, x:int, y:int, method:str, grid:bool=False) -> None:
+        photo = self.surfaces.show(f"grid {method}", layer)
+        self.draw_watermark([(self.image_datum_x, self.image_datum_y)], method=method, image=photo)
+        
+        self.grid_draw_ms = (time.perf_counter() - start) * 1000
+        self.grid_draw_worst_ms = max(self.grid_draw_worst_ms, self.grid_draw_ms)
+        
+    def draw_watermark(self, locs:list[tuple[int, int]], method:str, image:ImageTk.PhotoImage|None=None) -> None:
         """
-        draw watermark on (x, y) in canvas, watermark type is determined by args:method.
+        draw watermark on every (x, y) of locs in canvas, watermark type is determined by args:method.
+        existing items are moved with `canvas.coords()`, 
+        items are only created or deleted when number of locations changes.
 
         Args:
-            x (int): x location to draw on the canvas.
-            y (int): y location to draw on the canvas.
+            locs (list[tuple[int, int]]): locations to draw on the canvas.
             method (str): user action, 'clicked' or 'motion'.
+            image (ImageTk.PhotoImage | None, optional): image to draw instead of watermark. Defaults to None.
         """
         if method == 'clicked':
-            self.canvas_mark = self.canvas.create_image(x, y, image=self.mark, anchor='nw')
-            if grid:
-                self.grid_watermark.append(self.canvas_mark)
-        elif method == 'motion':
-            self.canvas_mark_preview = self.canvas.create_image(x, y, image=self.ghost, anchor='nw')
-            if grid:
-                self.grid_watermark_preview.append(self.canvas_mark_preview)
+            items, mark = self.mark_items, self.mark
+        else:
+            items, mark = self.preview_items, self.ghost
+        if image is None:
+            image = mark
+        
+        if image is not self.items_image[method]:
+            for item in items:
+                self.canvas.itemconfig(item, image=image)
+            self.items_image[method] = image
+        for item, (x, y) in zip(items, locs):
+            self.canvas.coords(item, x, y)
+        for x, y in locs[len(items):]:
+            items.append(self.canvas.create_image(x, y, image=image, anchor='nw'))
+        for item in items[len(locs):]:
+            self.canvas.delete(item)
+        del items[len(locs):]
        
     def mouse_loc_calibrate(self, x:int, y:int) -> tuple[int, int, tuple[int,int]|None]:
         """
@@ -1555,13 +1861,13 @@ class WaterMarker():
             snap_position = (0, 0)
         elif x >= x_max and y <= y_min: # top right corner
             mouse_loc = x_max, y_min
-            snap_position = (self.image_pil.width, 0)
+            snap_position = (self.image_size[0], 0)
         elif x <= x_min and y >= y_max: # btm left corner
             mouse_loc = x_min, y_max
-            snap_position = (0, self.image_pil.height)
+            snap_position = (0, self.image_size[1])
         elif x >= x_max and y >= y_max: # btm right corner
             mouse_loc = x_max, y_max
-            snap_position = (self.image_pil.width, self.image_pil.height)
+            snap_position = (self.image_size[0], self.image_size[1])
         elif x_max >= x >= x_min and y <= y_min: # top border
             mouse_loc = x, y_min
             x_loc = np.round((x - self.mark_offset_x_min - self.image_datum_x) * self.image_width_scale)
@@ -1569,7 +1875,7 @@ class WaterMarker():
         elif x_max >= x >= x_min and y >= y_max: # btm border
             mouse_loc = x, y_max
             x_loc = np.round((x - self.mark_offset_x_min - self.image_datum_x) * self.image_width_scale)
-            snap_position = round(x_loc), self.image_pil.height
+            snap_position = round(x_loc), self.image_size[1]
         elif x <= x_min and y_max >= y >= y_min: # left border
             mouse_loc = x_min, y
             y_loc = np.round((y - self.mark_offset_y_min - self.image_datum_y) * self.image_height_scale)
@@ -1577,7 +1883,7 @@ class WaterMarker():
         elif x >= x_max and y_max >= y >= y_min: # right border
             mouse_loc = x_max, y
             y_loc = np.round((y - self.mark_offset_y_min - self.image_datum_y) * self.image_height_scale)
-            snap_position = self.image_pil.width, round(y_loc)
+            snap_position = self.image_size[0], round(y_loc)
         else:
             raise ValueError(f"\
                 mind blown, clicked at (x:{x}, y:{y}), not in elif tree?\n\
@@ -1617,14 +1923,12 @@ class WaterMarker():
         angle = self.usrntr_rotate.get()
 
         # font of text
-        fnt = ImageFont.truetype(font=rq_font, size=pixel_size) 
+        fnt = sf.font_cache.get(rq_font, pixel_size)
         offset = (self.usrntr_offset_w.get(), self.usrntr_offset_h.get())
         text_color = *self.current_font_rgb, alpha
         
-        # get border of the text from PIL
-        _ = Image.new("RGBA", text_watermark_max_size)
-        f = ImageDraw.Draw(_)
-        f_bbox = f.textbbox((0, 0), self.usrntr_text(), font=fnt)
+        # get border of the text from metrics of the font
+        f_bbox = sf.text_bbox(self.usrntr_text(), fnt)
         
         # get text border sizes of the text with font
         width = f_bbox[2] - f_bbox[0] + border_w
@@ -1635,27 +1939,33 @@ class WaterMarker():
             return None
         
         if self.ckbtnvr_show_mark_bg.get():
-            base = Image.new("RGBA", (width, height), (*self.mark_bg, 255))
+            bg_color = (*self.mark_bg, 255)
         else:
-            base = Image.new("RGBA", (width, height), (255, 255, 255, 0))
-            
-        d = ImageDraw.Draw(base)
-        d.text(offset, self.usrntr_text(), font=fnt, fill=text_color)
+            bg_color = (255, 255, 255, 0)
         
-        mark_base = base.copy().convert("RGBA")
-        mark_rot = mark_base.rotate(angle, expand=True)
+        def make_base() -> Image.Image:
+            base = Image.new("RGBA", (width, height), bg_color)
+            d = ImageDraw.Draw(base)
+            d.text(offset, self.usrntr_text(), font=fnt, fill=text_color)
+            return base
         
-        self.store_pil(pil=mark_rot, type_="text")
-        size = self.get_image_size(pil=mark_rot, type_="text")
+        # everything the text watermark depends on, to reuse rendered text and its renditions
+        text_id = ("text", self.usrntr_text(), rq_font, pixel_size, text_color, bg_color, (width, height), offset)
+        self.mark_source = sf.renditions.get(text_id, make_base)
+        self.mark_id, self.mark_angle, self.mark_alpha = text_id, angle, None
+        self.mark_rotated_size = sf.rotated_size(self.mark_source.size, angle)
+        size = self.get_image_size(self.mark_rotated_size, type_="text")
         
-        mark = mark_rot.resize(size)
-        self.ghost = self.mark = ImageTk.PhotoImage(mark)
+        mark = sf.transformed(self.mark_source, text_id, angle=angle, size=size, profile=sf.interactive)
+        self.mark_display = mark
+        self.ghost = self.mark = self.surfaces.show("mark", mark)
         
         self.is_mark = True
         self.update_mark_offset()
         
         # update preview
         self.lbl_watermark_preview.config(image=self.mark) # type: ignore
+        self.refresh_zoom()
     
     
     def save_image(self, *, abs_path:str, call_by_func:bool|None=None) -> None:
@@ -1664,99 +1974,290 @@ class WaterMarker():
         snap to border if watermark will be outside of image,
         image will be saved at root folder in project.
         """
-        true_markpil_width:int = round(np.round(self.mark_pil.width * self.usrntr_scale.get()))
-        true_markpil_height:int = round(np.round(self.mark_pil.height * self.usrntr_scale.get()))
-        
-        if self.ckbtnvr_snap.get() and self.snap_position:
-            x, y = self.true_position
-            if self.true_position[0] == self.image_pil.width:
-                x -= true_markpil_width + self.usrntr_shift_h.get()
-            if self.true_position[1] == self.image_pil.height:
-                y -= true_markpil_height + self.usrntr_shift_v.get()
-        else:
-            true_x = self.true_position[0] - self.mark_offset_x_min - self.image_datum_x
-            true_y = self.true_position[1] - self.mark_offset_y_min - self.image_datum_y
-            x:int = round(np.round(true_x * self.image_width_scale)) + self.usrntr_shift_h.get()
-            y:int = round(np.round(true_y * self.image_height_scale)) + self.usrntr_shift_v.get()
-            
-        offset = (x, y)
-        
-        mark = self.mark_pil.copy()
-        size = true_markpil_width, true_markpil_height
-        resized_mark = mark.resize(size)
+        # written in background, spec is frozen now so user can go on with next image
+        self.save_queue.submit(self.filepath_image, abs_path, self.mark_spec())
+        self.poll_saves()
+    
+    def poll_saves(self) -> None:
+        """
+        show how many saves are being written, report failed ones as soon as they fail,
+        close window when all are written if user asked to close.
+        """
+        errors = self.save_queue.take_errors()
+        if errors:
+            failed = "\n".join(f"{path}: {error}" for path, error in errors[:10])
+            messagebox.showerror(
+                title="Some images are not saved.", 
+                message=f"{len(errors)} failed:\n{failed}",
+            )
         
-        if self.ckbtnvr_grid.get():
-            grid_space = self.usrntr_grid.get()
-            mark = self.grid_mark_maker(round(x), round(y), grid_space, resized_mark)
-            offset = 0, 0
-            result_mark = mark.copy()
+        pending = self.save_queue.pending
+        if pending and self.closing:
+            self.save_status.set(f"finishing {pending} saves before exit...")
+        elif pending:
+            self.save_status.set(f"saving {pending}...")
         else:
-            result_mark = resized_mark.copy()
-            
-        result_image = self.image_pil.copy()
-        result_image.alpha_composite(result_mark, offset)
-        result_image.save(abs_path)
-        
-    def grid_mark_maker(self, x:int, y:int, grid_space:int, mark:Image.Image) -> Image.Image:
-        width = self.image_pil.width
-        height = self.image_pil.height
-        
-        with Image.new("RGBA", (width, height)) as base:
-            locs = self.grid_calculate(x, y, grid_space, on="image")
-            for x in locs['x']:
-                for y in locs['y']:
-                    base.paste(im=mark, box=(x,y))
-            return base.copy()
+            self.save_status.set("")
+        
+        if pending:
+            if not self.saves_polling:
+                self.saves_polling = True
+                self.window.after(batch_poll_ms, self.repoll_saves)
+        elif self.closing:
+            self.window.destroy()
     
-    def grid_calculate(self, x:int, y:int, grid_space:int, on:_loc) -> dict[str, list[int]]:
-        if on == "canvas":
-            width = self.image.width() + self.mark.width()
-            height = self.image.height() + self.mark.height()
-            step = max(self.mark.width(), self.mark.height()) + grid_space
-            x_max = self.canvas.winfo_reqwidth()
-            y_max = self.canvas.winfo_reqheight()
-        elif on == "image":
-            scaled_markpil_width = round(np.round(self.mark_pil.width * self.usrntr_scale.get()))
-            width = self.image_pil.width + scaled_markpil_width
-            
-            scaled_markpil_height = round(np.round(self.mark_pil.height * self.usrntr_scale.get()))
-            height = self.image_pil.height + scaled_markpil_height
-            
-            grid_scale = min(self.image_width_scale, self.image_height_scale)
-            step = max(scaled_markpil_width, scaled_markpil_height) + round(grid_space * grid_scale)
-            x_max = width + step
-            y_max = height + step
-            
-        if x != 0:
-            x_min = x - (x // step + 1) * step
+    def repoll_saves(self) -> None:
+        self.saves_polling = False
+        self.poll_saves()
+        
+    def mark_spec(self, profile:sf.RenderProfile=sf.export) -> sf.MarkSpec:
+        """
+        freeze current watermark settings into a spec, 
+        which renders watermark to any image without canvas.
+
+        Args:
+            profile (sf.RenderProfile, optional): resampling filters to render with. Defaults to sf.export.
+        """
+        if self.switch_state == "image":
+            opaque = self.usrntr_opaque.get()
+            alpha = round(np.round((opaque/100) * 255))
         else:
-            x_min = 0
-        if y != 0:
-            y_min = y - (y // step + 1) * step
+            # opacity of text is already in the color of text
+            alpha = None
+        
+        if self.ckbtnvr_snap.get() and self.snap_position:
+            snap = (
+                self.true_position[0] / self.image_size[0], 
+                self.true_position[1] / self.image_size[1], 
+            )
         else:
-            y_min = 0
-        x_locs = [x_loc for x_loc in range(x_min, x_max, step)]
-        y_locs = [y_loc for y_loc in range(y_min, y_max, step)]
+            snap = None
         
-        return {
-            "x": x_locs, 
-            "y": y_locs, 
-        }
+        return sf.MarkSpec(
+            mark=self.mark_source, 
+            mark_id=self.mark_id, 
+            angle=self.usrntr_rotate.get(), 
+            alpha=alpha, 
+            scale=self.usrntr_scale.get(), 
+            grid=self.ckbtnvr_grid.get(), 
+            grid_space=self.usrntr_grid.get(), 
+            position=self.true_position, 
+            mark_offset=(self.mark_offset_x_min, self.mark_offset_y_min), 
+            snap=snap, 
+            shift=(self.usrntr_shift_h.get(), self.usrntr_shift_v.get()), 
+            canvas_size=(self.canvas.winfo_reqwidth(), self.canvas.winfo_reqheight()), 
+            canvas_pad=(canvas_padx, canvas_pady), 
+            profile=profile, 
+        )
     
     def apply_to_folder(self, event=None):
+        if self.batch_thread is not None:
+            return None
         if not self.condition_met(func_="apply_to_folder"):
             return None
         
         save_dir = self.save_dir.get()
+        spec = self.mark_spec(profile=sf.profiles[self.cmbbx_profile.get()])
+        # names are decided here by index, workers may finish in any order
+        jobs = []
         for idx, path in enumerate(self.apply_paths):
-            self.filepath_image = path
-            self.load_image()
-            
-            fname = self.get_fname(idx=idx)
-            save_path = save_dir + "/" + fname
-            self.save_image(abs_path=save_path, call_by_func=True)
+            fname = self.get_fname(idx=idx, filepath=path)
+            jobs.append((path, save_dir + "/" + fname))
+        
+        try:
+            workers = self.usrntr_workers.get()
+        except tk.TclError:
+            workers = max_workers
+        
+        # render in background, progress is picked up by self.poll_batch()
+        self.batch_report = sf.BatchReport(total=len(jobs), profile=spec.profile)
+        self.batch_cancel = threading.Event()
+        self.batch_thread = threading.Thread(
+            target=sf.render_batch, 
+            args=(jobs, spec), 
+            kwargs={
+                "workers": workers, 
+                "report": self.batch_report, 
+                "cancel": self.batch_cancel, 
+            }, 
+            daemon=True, 
+        )
+        self.batch_thread.start()
         self.apply_paths = []
+        
+        self.btn_apply_savefmt.config(state="disabled")
+        self.btn_cancel_batch.config(state="normal")
+        self.pgbr_batch.config(maximum=len(jobs), value=0)
+        self.window.after(batch_poll_ms, self.poll_batch)
     
+    def poll_batch(self) -> None:
+        """
+        update progress of apply to folder from the mainloop, 
+        until the background batch is finished.
+        """
+        report = self.batch_report
+        running = self.batch_thread is not None and self.batch_thread.is_alive()
+        
+        if self.tplvl_save.winfo_exists():
+            self.pgbr_batch.config(value=report.done)
+            if running and not self.batch_cancel.is_set():
+                eta = "--" if report.eta is None else f"{report.eta:.0f}s"
+                self.batch_status.set(
+                    f"{report.done}/{report.total}, {report.rate:.1f} images/sec, ETA {eta}"
+                )
+            elif not running:
+                self.batch_status.set(str(report))
+                self.btn_apply_savefmt.config(state="normal")
+                self.btn_cancel_batch.config(state="disabled")
+        
+        if running:
+            self.window.after(batch_poll_ms, self.poll_batch)
+        else:
+            self.batch_thread = None
+            self.show_report(report)
+    
+    def show_report(self, report:sf.BatchReport) -> None:
+        if log_stats:
+            print(report)
+        if report.errors:
+            failed = "\n".join(f"{path}: {error}" for path, error in report.errors[:10])
+            messagebox.showwarning(
+                title="Some images failed.", 
+                message=f"{report}\n{len(report.errors)} failed:\n{failed}", 
+                )
+        else:
+            messagebox.showinfo(title="Done.", message=str(report))
+    
+    def update_zoom(self) -> None:
+        if self.ckbtnvr_zoom.get():
+            self.enter_zoom()
+        else:
+            self.exit_zoom()
+        
+    def enter_zoom(self) -> None:
+        """
+        show the watermarked image at 100% in tiles, 
+        centered on where the watermark is placed, or on the image if it's not placed yet.
+        """
+        self.viewer = sf.TileRenderer(self.filepath_image, self.zoom_spec())
+        self.zoom_level = 0
+        if self.viewer.spec is not None:
+            # same position as saved image, snapped or not
+            mark, (x, y), _ = self.viewer.level_mark(0)
+            center_x, center_y = x + mark.width / 2, y + mark.height / 2
+        else:
+            center_x, center_y = self.image_size[0] / 2, self.image_size[1] / 2
+        self.view_x = round(center_x - self.canvas.winfo_reqwidth() / 2)
+        self.view_y = round(center_y - self.canvas.winfo_reqheight() / 2)
+        
+        self.canvas.itemconfig("all", state="hidden")
+        for seq in ("<Button-1>", "<Motion>"):
+            self.canvas.unbind(seq)
+        self.canvas.bind("<ButtonPress-1>", self.zoom_pan_start)
+        self.canvas.bind("<B1-Motion>", self.zoom_pan)
+        self.canvas.bind("<MouseWheel>", self.zoom_wheel)
+        self.canvas.bind("<Button-4>", self.zoom_wheel)
+        self.canvas.bind("<Button-5>", self.zoom_wheel)
+        self.draw_tiles()
+        
+    def exit_zoom(self) -> None:
+        "back to the canvas as it was before zoom."
+        if self.viewer is None:
+            return None
+        self.viewer.close()
+        self.viewer = None
+        self.canvas.delete("tile")
+        self.tile_items.clear()
+        for seq in ("<ButtonPress-1>", "<B1-Motion>", "<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.canvas.unbind(seq)
+        # placed watermark is kept, redraw it where user clicked in case settings were changed while zoomed
+        self.canvas.itemconfig("all", state="normal")
+        if self.mark_items:
+            self.canvas_action(None, method="clicked", call_by_func=True)
+        self.bind_canvas_action()
+        
+    def zoom_spec(self) -> sf.MarkSpec|None:
+        "spec of the placed watermark, None if it's not placed yet."
+        if self.is_mark and self.clicked:
+            return self.mark_spec()
+        return None
+        
+    def refresh_zoom(self) -> None:
+        "show the changed watermark settings in zoom mode."
+        if self.viewer is None:
+            return None
+        self.viewer.set_spec(self.zoom_spec())
+        self.canvas.delete("tile")
+        self.tile_items.clear()
+        self.draw_tiles()
+        
+    def draw_tiles(self) -> None:
+        """
+        draw only tiles of current level seen in canvas, 
+        tiles already drawn are moved, tiles out of sight are deleted.
+        """
+        if self.viewer is None:
+            return None
+        viewer = self.viewer
+        tile_size = viewer.tile_size
+        canvas_w, canvas_h = self.canvas.winfo_reqwidth(), self.canvas.winfo_reqheight()
+        level_w, level_h = viewer.level_size(self.zoom_level)
+        
+        # keep image in sight, center it if it's smaller than canvas
+        if level_w <= canvas_w:
+            self.view_x = -((canvas_w - level_w) // 2)
+        else:
+            self.view_x = min(max(self.view_x, 0), level_w - canvas_w)
+        if level_h <= canvas_h:
+            self.view_y = -((canvas_h - level_h) // 2)
+        else:
+            self.view_y = min(max(self.view_y, 0), level_h - canvas_h)
+        
+        cols = range(max(self.view_x, 0) // tile_size, min(self.view_x + canvas_w, level_w - 1) // tile_size + 1)
+        rows = range(max(self.view_y, 0) // tile_size, min(self.view_y + canvas_h, level_h - 1) // tile_size + 1)
+        seen = {(col, row) for col in cols for row in rows}
+        
+        for key in list(self.tile_items):
+            if key not in seen:
+                self.canvas.delete(self.tile_items.pop(key)[0])
+        for col, row in seen:
+            x, y = col * tile_size - self.view_x, row * tile_size - self.view_y
+            if (col, row) in self.tile_items:
+                self.canvas.coords(self.tile_items[col, row][0], x, y)
+            else:
+                photo = ImageTk.PhotoImage(viewer.tile(self.zoom_level, col, row))
+                item = self.canvas.create_image(x, y, image=photo, anchor='nw', tags="tile")
+                self.tile_items[col, row] = item, photo
+        
+    def zoom_pan_start(self, event:tk.Event) -> None:
+        self.pan_start = event.x, event.y, self.view_x, self.view_y
+        
+    def zoom_pan(self, event:tk.Event) -> None:
+        "move view with mouse drag, tiles are drawn once per frame."
+        x0, y0, view_x, view_y = self.pan_start
+        self.view_x = view_x - (event.x - x0)
+        self.view_y = view_y - (event.y - y0)
+        self.scheduler.request(self.draw_tiles)
+        
+    def zoom_wheel(self, event:tk.Event) -> None:
+        "zoom in or out by one level, keep the pixel under mouse in place."
+        if self.viewer is None:
+            return None
+        zoom_in = event.num == 4 or getattr(event, "delta", 0) > 0
+        level = self.zoom_level - 1 if zoom_in else self.zoom_level + 1
+        level = min(max(level, 0), self.viewer.max_level)
+        if level == self.zoom_level:
+            return None
+        
+        scale = 2 ** (self.zoom_level - level)
+        self.view_x = round((self.view_x + event.x) * scale - event.x)
+        self.view_y = round((self.view_y + event.y) * scale - event.y)
+        self.zoom_level = level
+        # every tile is of another level now
+        self.canvas.delete("tile")
+        self.tile_items.clear()
+        self.scheduler.request(self.draw_tiles)
+        
     # update stuff
     def update_canvas_bg(self) -> None:
         if self.ckbtnvr_show_cnvs_bg.get():
@@ -1770,15 +2271,22 @@ class WaterMarker():
         bind M1 and mouse motion with function:self.canvas_action,
         set focus to canvas.
         """
+        if self.viewer is not None:
+            return None
+        self.bind_canvas_action()
+        if self.is_mark and self.is_image:
+            self.remove_exist_watermark(method="motion")
+            self.remove_exist_watermark(method="clicked")
+        
+    def bind_canvas_action(self) -> None:
+        "bind M1 and mouse motion if both watermark and image exist, without touching watermarks on canvas."
         if self.is_mark and self.is_image:
             self.canvas.bind("<Button-1>", lambda event: self.canvas_action(event, method='clicked'))
             if self.ckbtnvr_show_preview.get():
-                self.canvas.bind("<Motion>", lambda event: self.canvas_action(event, method='motion'))
+                self.canvas.bind("<Motion>", self.motion_action)
             else:
                 self.canvas.unbind("<Motion>")
             self.canvas.focus_set()
-            self.remove_exist_watermark(method="motion")
-            self.remove_exist_watermark(method="clicked")
         else:
             self.canvas.unbind("<Button-1>")
         
@@ -1789,13 +2297,17 @@ class WaterMarker():
             self.btnf_text_mode()
         
     def update_mark_size(self):
-        width = np.round(self.mark_pil.width / self.image_width_scale)
-        height = np.round(self.mark_pil.height / self.image_height_scale)
+        width = np.round(self.mark_rotated_size[0] / self.image_width_scale)
+        height = np.round(self.mark_rotated_size[1] / self.image_height_scale)
         size = (round(width), round(height))
         
-        image_resize = self.mark_pil.resize(size)
+        image_resize = sf.transformed(
+            self.mark_source, self.mark_id, 
+            angle=self.mark_angle, alpha=self.mark_alpha, size=size, profile=sf.interactive
+            )
         
-        self.ghost = self.mark = ImageTk.PhotoImage(image_resize)
+        self.mark_display = image_resize
+        self.ghost = self.mark = self.surfaces.show("mark", image_resize)
         
     def update_mark_offset(self) -> None:
         """
@@ -1826,9 +2338,7 @@ class WaterMarker():
     # support functions
     def store_pil(self, pil:Image.Image, type_:_img) -> None:
         if type_ == 'image':
-            self.image_pil = pil
-        elif type_ == 'mark' or type_ == "text":
-            self.mark_pil = pil
+            self.image_size = pil.size
             
     def clear_tkentry_text(self, event=None) -> None:
         """
@@ -1840,21 +2350,21 @@ class WaterMarker():
         """
         self.tktxt_entry.delete(0.0, tk.END)
         self.tktxt_entry.unbind("<Button-1>")
-        self.tktxt_entry.bind("<KeyRelease>", self.text_mark_maker)
+        self.tktxt_entry.bind("<KeyRelease>", self.scheduler.wrap(self.text_mark_maker))
         
     def get_image_size(
         self, 
-        pil:Image.Image, 
+        pil_size:tuple[int, int], 
         type_:_img, 
         max_size:tuple[int,int]|None=None
         ) -> tuple[int, int]:
         
         if type_ == "text":
-            width = np.round(pil.width / self.image_width_scale)
-            height = np.round(pil.height / self.image_height_scale)
+            width = np.round(pil_size[0] / self.image_width_scale)
+            height = np.round(pil_size[1] / self.image_height_scale)
             size = (round(width), round(height))
         else:
-            size = self.image_size_calculate(pil.width, pil.height, type_=type_, max_size=max_size)
+            size = self.image_size_calculate(*pil_size, type_=type_, max_size=max_size)
         rq_scale = self.usrntr_scale.get()
         rq_width = np.round(size[0] * rq_scale)
         rq_height = np.round(size[1] * rq_scale)
@@ -1915,25 +2425,14 @@ class WaterMarker():
         3. remove all not-the-current watermark and preview
         
         Args:
-            method (str): user action, 'clicked' or 'motion'.
+            method (str): user action, 'clicked', 'motion' or 'all'.
         """
-        try:
-            if method == 'clicked':
-                self.canvas.delete(self.canvas_mark)
-            elif method == 'motion':
-                self.canvas.delete(self.canvas_mark_preview)
-            elif method == "all":
-                self.canvas.delete(self.canvas_mark_preview)
-                self.canvas.delete(self.canvas_mark)
-        except AttributeError:
-            print("making sure to remove unwanted watermarks")
-        
-        if self.ckbtnvr_grid.get() and method == 'clicked':
-            for item in self.grid_watermark:
-                self.canvas.delete(item)
-        elif self.ckbtnvr_grid.get() and method == 'motion':
-            for item in self.grid_watermark_preview:
-                self.canvas.delete(item)
+        if method in ('clicked', 'all'):
+            self.canvas.delete(*self.mark_items)
+            self.mark_items.clear()
+        if method in ('motion', 'all'):
+            self.canvas.delete(*self.preview_items)
+            self.preview_items.clear()
         
     def length_valid(self, width:int, height:int, bbox:tuple[int, int, int, int]) -> bool:
         condition = []
@@ -2023,33 +2522,8 @@ class WaterMarker():
             if len(all_style) > 1:
                 if "Regular" not in all_style and "regular" not in all_style:
                     print(name, font_dict[name])
-
-    def __get_rotated_size(self, width, height, angle):
-        adj = width / 2
-        opp = height / 2
-        hyp = math.sqrt(adj**2 + opp**2)
-        
-        if angle in [0, 180, 360]:
-            return width, height
-        elif angle in [90, 270]:
-            return height, width
-        
-        angle = angle % 180
-        if angle > 90:
-            angle = 90 - (angle - 90)
-        
-        hyp = math.sqrt(adj**2 + opp**2)
-        equa = (adj**2 + hyp**2 - opp**2) / (2*adj*hyp)
-        
-        deg_a = math.degrees(math.acos(equa))
-        deg_b = np.absolute(angle - deg_a)
-        
-        deg_c = (90 - angle) - deg_a
-        deg_d = 90- deg_c
-        
-        width = round(math.ceil(math.cos(deg_b * (math.pi / 180)) * hyp * 2))
-        height = round(math.ceil(math.sin(deg_d * (math.pi / 180)) * hyp * 2))
-        return width, height
     
-wm = WaterMarker()
-wm.operate()
\ No newline at end of file
+# guard is needed by worker processes of apply to folder, which import this file again
+if __name__ == "__main__":
+    wm = WaterMarker()
+    wm.operate()
\ No newline at end of file
@@ -1,3 +1,19 @@
 from support_func.tooltip import (
-    TipManager, get_sysfont_sorted, CustomScale, CustomSpinbox
+    TipManager, CustomScale, CustomSpinbox
+)
+from support_func.fonts import (
+    FontIndex, FontScanner, get_sysfont_sorted, find_font, text_bbox
+)
+from support_func.render import (
+    RenderProfile, ProfileTiming, interactive, export, profiles, profile_timing, 
+    MarkSpec, BatchReport, SaveQueue, TileRenderer, pyramid_level, fit_level, load_preview, Prefetcher, render, render_to_file, render_batch, grid_locations, tile_grid, grid_layer, rotated_size, transformed
+)
+from support_func.cache import (
+    CacheStats, SourceCache, RenditionCache, FontCache, TileCache, mark_sources, renditions, pyramids, font_cache
+)
+from support_func.schedule import (
+    RenderScheduler, LatencyLog
+)
+from support_func.surface import (
+    PhotoSurfaces
 )
\ No newline at end of file
@@ -0,0 +1,246 @@
+import os, threading
+
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from PIL import Image, ImageFont
+
+class CacheStats():
+    """
+    hit and miss counter shared by caches in this module.
+    """
+    name = "cache"
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        "hits / lookups, 0 if never looked up."
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.hits} hits, {self.misses} misses, {self.hit_rate:.0%} hit rate."
+
+class SourceCache(CacheStats):
+    """
+    decoded RGBA images by file path, decode again only if the file is modified.
+    images returned are shared, copy before changing them in place.
+
+    Example:
+     >>> import support_func as sf
+     >>> image = sf.mark_sources.get("assets/img/watermark.png")
+     >>> print(sf.mark_sources)
+
+    """
+    name = "watermark sources"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.images:dict[str, tuple[float, Image.Image]] = {}
+
+    def get(self, filepath:str) -> Image.Image:
+        """
+        get decoded image of filepath in RGBA.
+
+        Args:
+            filepath (str): file path of the image.
+
+        Returns:
+            Image.Image: the decoded image.
+        """
+        mtime = self.key(filepath)[1]
+        cached = self.images.get(filepath)
+        if cached is not None and cached[0] == mtime:
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        # // load image and convert it to RGBA, to avoid ValueError: images do not match
+        image = Image.open(filepath).convert("RGBA")
+        self.images[filepath] = mtime, image
+        return image
+
+    def key(self, filepath:str) -> tuple[str, float]:
+        "identify the current content of filepath, (file path, modified time)."
+        return filepath, os.path.getmtime(filepath)
+
+    def clear(self) -> None:
+        self.images.clear()
+
+class RenditionCache(CacheStats):
+    """
+    least recently used images by key, 
+    evict the oldest ones when total size of images is over max_bytes.
+    images returned are shared, copy before changing them in place.
+    safe to use from background threads, images are made outside of the lock.
+    
+    Example:
+     >>> import support_func as sf
+     >>> rotated = sf.renditions.get(key, lambda: mark.rotate(angle, expand=True))
+    
+    """
+    name = "watermark renditions"
+
+    def __init__(self, max_bytes:int, name:str|None=None) -> None:
+        """
+        Args:
+            max_bytes (int): max total size of cached images.
+            name (str | None, optional): name shown in stats, None to use the class name. Defaults to None.
+        """
+        super().__init__()
+        if name is not None:
+            self.name = name
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.images:OrderedDict[Hashable, Image.Image] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key:Hashable, make:Callable[[], Image.Image]) -> Image.Image:
+        """
+        get image of key, call make() to create it if not cached.
+
+        Args:
+            key (Hashable): everything the image depends on.
+            make (Callable[[], Image.Image]): create the image.
+
+        Returns:
+            Image.Image: the cached or created image.
+        """
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.hits += 1
+                self.images.move_to_end(key)
+                return image
+            self.misses += 1
+
+        image = make()
+        size = image_nbytes(image)
+        if size > self.max_bytes:
+            return image
+        with self.lock:
+            if key in self.images:
+                # made by another thread at the same time
+                return self.images[key]
+            self.images[key] = image
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                _, oldest = self.images.popitem(last=False)
+                self.nbytes -= image_nbytes(oldest)
+        return image
+
+    def peek(self, key:Hashable) -> Image.Image|None:
+        "get image of key if cached, without counting it as hit or miss, or marking it as recently used."
+        return self.images.get(key)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.images.clear()
+            self.nbytes = 0
+
+    def __str__(self) -> str:
+        size = f"{len(self.images)} images in {self.nbytes / 2**20:.1f} MB"
+        return f"{self.name}: {self.hits} hits, {self.misses} misses, {self.hit_rate:.0%} hit rate, {size}."
+
+class FontCache(CacheStats):
+    """
+    least recently used FreeType fonts by (font file, size), 
+    so typing doesn't open and parse the font file again on every key.
+    
+    Example:
+     >>> import support_func as sf
+     >>> fnt = sf.font_cache.get("arial.ttf", 21.3)
+    
+    """
+    name = "fonts"
+
+    def __init__(self, max_fonts:int) -> None:
+        super().__init__()
+        self.max_fonts = max_fonts
+        self.fonts:OrderedDict[tuple[str, float], ImageFont.FreeTypeFont] = OrderedDict()
+
+    def get(self, font:str, size:float) -> ImageFont.FreeTypeFont:
+        """
+        get loaded font, load it if not cached.
+
+        Args:
+            font (str): file name or file path of the font.
+            size (float): size of font in pixels.
+
+        Returns:
+            ImageFont.FreeTypeFont: the loaded font.
+        """
+        key = font, size
+        fnt = self.fonts.get(key)
+        if fnt is not None:
+            self.hits += 1
+            self.fonts.move_to_end(key)
+            return fnt
+
+        self.misses += 1
+        fnt = ImageFont.truetype(font=font, size=size)
+        self.fonts[key] = fnt
+        if len(self.fonts) > self.max_fonts:
+            self.fonts.popitem(last=False)
+        return fnt
+
+    def clear(self) -> None:
+        self.fonts.clear()
+
+class TileCache(CacheStats):
+    """
+    least recently used tiles by key, keep at most max_tiles of them.
+    
+    Example:
+     >>> import support_func as sf
+     >>> tiles = sf.TileCache(max_tiles=256)
+     >>> tile = tiles.get((level, col, row), lambda: make_tile(level, col, row))
+    
+    """
+    name = "tiles"
+
+    def __init__(self, max_tiles:int) -> None:
+        super().__init__()
+        self.max_tiles = max_tiles
+        self.tiles:OrderedDict[Hashable, Image.Image] = OrderedDict()
+
+    def get(self, key:Hashable, make:Callable[[], Image.Image]) -> Image.Image:
+        """
+        get tile of key, call make() to create it if not cached.
+
+        Args:
+            key (Hashable): everything the tile depends on.
+            make (Callable[[], Image.Image]): create the tile.
+
+        Returns:
+            Image.Image: the cached or created tile.
+        """
+        tile = self.tiles.get(key)
+        if tile is not None:
+            self.hits += 1
+            self.tiles.move_to_end(key)
+            return tile
+
+        self.misses += 1
+        tile = make()
+        self.tiles[key] = tile
+        if len(self.tiles) > self.max_tiles:
+            self.tiles.popitem(last=False)
+        return tile
+
+    def clear(self) -> None:
+        self.tiles.clear()
+
+def image_nbytes(image:Image.Image) -> int:
+    "rough memory size of image pixels."
+    return image.width * image.height * len(image.getbands())
+
+mark_sources = SourceCache()
+renditions = RenditionCache(max_bytes=256 * 2**20)
+# levels of large images, kept apart so one of them doesn't evict every watermark rendition
+pyramids = RenditionCache(max_bytes=384 * 2**20, name="image pyramids")
+font_cache = FontCache(max_fonts=16)
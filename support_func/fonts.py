@@ -0,0 +1,233 @@
+import json, os, queue, threading, time
+
+import matplotlib
+
+from collections.abc import Iterator
+from matplotlib import font_manager
+from PIL import Image, ImageDraw, ImageFont
+
+# name and style of every font file, kept between runs
+font_index_path = os.path.join(os.path.expanduser("~"), ".markit", "font_index.json")
+
+# cite: https://en.wikipedia.org/wiki/List_of_typefaces_included_with_Microsoft_Windows
+fname_table = {
+    'MingLiU': '新細明體',
+    "DFKai-SB": '標楷體',
+    'Microsoft JhengHei': '微軟正黑體',
+    'Microsoft YaHei': '微軟雅黑體',
+    'SimSun': '中易宋體',
+}
+
+# 1x1 image to measure multiline text, textbbox only needs its mode not its size
+_measure = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
+def text_bbox(text:str, font:ImageFont.FreeTypeFont) -> tuple[int, int, int, int]:
+    """
+    border box of text drawn at (0, 0), same as ImageDraw.textbbox(),
+    read from metrics of the font without drawing on a image.
+
+    Args:
+        text (str): text to measure.
+        font (ImageFont.FreeTypeFont): font of text.
+
+    Returns:
+        tuple[int, int, int, int]: (left, top, right, bottom)
+    """
+    if "\n" in text:
+        return _measure.multiline_textbbox((0, 0), text, font=font) # type: ignore
+    return font.getbbox(text) # type: ignore
+
+class FontIndex():
+    """
+    name and style of font files, stored as json in index_path, 
+    each font file is keyed by its file path, and only trusted 
+    when file size and modified time are still the same.
+    
+    Example:
+     >>> index = FontIndex(font_index_path)
+     >>> name, style = index.getname("C:\\Windows\\Fonts\\arial.ttf")
+     >>> index.save()
+    
+    """
+    def __init__(self, index_path:str) -> None:
+        self.index_path = index_path
+        self.changed = False
+        try:
+            with open(index_path, encoding="utf-8") as file:
+                self.fonts:dict[str, dict] = json.load(file)
+        except (OSError, ValueError):
+            self.fonts = {}
+    
+    def getname(self, filepath:str) -> tuple[str|None, str|None]:
+        """
+        get name and style of font file, open the file only if it's new or changed.
+
+        Args:
+            filepath (str): file path of the font.
+
+        Returns:
+            tuple[str|None, str|None]: (name, style), None if font file can't be read.
+        """
+        stat = os.stat(filepath)
+        entry = self.fonts.get(filepath)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return entry["name"], entry["style"]
+        
+        try:
+            name, style = ImageFont.FreeTypeFont(filepath).getname()
+        except OSError:
+            name, style = None, None
+        self.fonts[filepath] = {
+            "size": stat.st_size, 
+            "mtime": stat.st_mtime, 
+            "name": name, 
+            "style": style, 
+        }
+        self.changed = True
+        return name, style
+    
+    def save(self, keep:list[str]|None=None) -> None:
+        """
+        write index to index_path if anything changed.
+
+        Args:
+            keep (list[str] | None, optional): file paths of fonts still installed,
+                others are removed from index. Defaults to None, keep all.
+        """
+        if keep is not None:
+            keep_set = set(keep)
+            removed = [filepath for filepath in self.fonts if filepath not in keep_set]
+            for filepath in removed:
+                del self.fonts[filepath]
+            self.changed = self.changed or bool(removed)
+        if not self.changed:
+            return
+        
+        # write to a temporary file first, so a crash won't leave a broken index
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(self.fonts, file, ensure_ascii=False)
+        os.replace(temp_path, self.index_path)
+        self.changed = False
+
+def get_sysfont_sorted(index_path:str|None=None) -> dict[str, dict[str, str]]:
+    """
+    get every font's name, filename, weight in path: C:/Windows/Fonts into a dict,
+    change the names of some(commonly used) Chinese-supported(zh-TW) fonts to Chinese.
+    name and style of fonts are read from FontIndex, only new or changed font files are opened.
+    use FontScanner to get fonts without waiting for all of them.
+    
+    #! this function assumes any font file only correspond with a unique style with the same font name.
+    #! this function is not suitable for more then one correspond between style and file.
+    
+    C:/Windows/Fonts:
+    ├──file_1.ttf    # font name:a, style: 1
+    ├──file_2.ttf    # font name:a, style: 2
+    ├──file_3.ttf    # font name:a, style: 3
+    ├──file_4.ttf    # font name:a, style: 3
+    ├──file_5.ttf    # font name:b, style: 1
+    └──file_6.ttf    # font name:c, style: 2
+    └──file_7.ttf    # font name:c, style: 3
+    -> only file_3.ttf will be lost. 
+    # * only return the last file of the the same font name and style got looped by this function.
+    
+    Args:
+        index_path (str | None, optional): file path of the font index, 
+            None to use `font_index_path`. Defaults to None.
+    
+    Returns:
+        dict[str, dict[str, list[str]]]: {'font name': {'weight': ['...', ...], 'fname': 'file name', ...]}, ...}
+    """
+    fonts_dict:dict[str, dict[str, str]] = {}
+    for font_name, style, file_name in iter_sysfonts(index_path):
+        if font_name not in fonts_dict.keys():
+            fonts_dict[font_name] = {}
+        fonts_dict[font_name][style] = file_name
+    return dict(fonts_dict.items())
+
+def font_entry(index:FontIndex, filepath:str) -> tuple[str, str, str]|None:
+    """
+    name, style and file name of a font file, 
+    name of some Chinese-supported fonts are changed to Chinese.
+
+    Args:
+        index (FontIndex): index to read name and style from.
+        filepath (str): file path of the font.
+
+    Returns:
+        tuple[str, str, str] | None: (font name, style, file name), None if font has no name or style.
+    """
+    # cite: https://stackoverflow.com/questions/75310650/how-to-get-font-path-from-font-name-python
+    name, style = index.getname(filepath)
+    if not (name and style):
+        return None
+    file_name = os.path.basename(filepath)
+    font_name = fname_table.get(name, name)
+    return font_name, style, file_name
+
+def iter_sysfonts(index_path:str|None=None) -> Iterator[tuple[str, str, str]]:
+    """
+    yield (font name, style, file name) of every system font one by one,
+    index is saved after the last font.
+
+    Args:
+        index_path (str | None, optional): file path of the font index, 
+            None to use `font_index_path`. Defaults to None.
+    """
+    sysfonts = font_manager.findSystemFonts()
+    index = FontIndex(index_path or font_index_path)
+    for filepath in sysfonts: 
+        entry = font_entry(index, filepath)
+        if entry is not None:
+            yield entry
+    index.save(keep=sysfonts)
+
+def find_font(name:str, index_path:str|None=None) -> dict[str, dict[str, str]]:
+    """
+    get styles of one font without going through every system font,
+    files are looked up in font list cached by matplotlib.
+
+    Args:
+        name (str): name of the font, e.g. "Arial".
+        index_path (str | None, optional): file path of the font index, 
+            None to use `font_index_path`. Defaults to None.
+
+    Returns:
+        dict[str, dict[str, str]]: {'font name': {'style': 'file name', ...}}, empty if not found.
+    """
+    index = FontIndex(index_path or font_index_path)
+    fonts_dict:dict[str, dict[str, str]] = {}
+    bundled = matplotlib.get_data_path()
+    for font in font_manager.fontManager.ttflist:
+        # skip fonts shipped with matplotlib, they're not system fonts
+        if font.name != name or font.fname.startswith(bundled):
+            continue
+        entry = font_entry(index, font.fname)
+        if entry is not None:
+            font_name, style, file_name = entry
+            fonts_dict.setdefault(font_name, {})[style] = file_name
+    return fonts_dict
+
+class FontScanner(threading.Thread):
+    """
+    go through every system font in a background thread,
+    fonts found are put into `self.found` one by one.
+    
+    Example:
+     >>> scanner = FontScanner()
+     >>> scanner.start()
+     >>> font_name, style, file_name = scanner.found.get()
+    
+    """
+    def __init__(self, index_path:str|None=None) -> None:
+        super().__init__(daemon=True)
+        self.index_path = index_path
+        self.found:queue.Queue[tuple[str, str, str]] = queue.Queue()
+        self.elapsed:float|None = None
+    
+    def run(self) -> None:
+        start = time.perf_counter()
+        for entry in iter_sysfonts(self.index_path):
+            self.found.put(entry)
+        self.elapsed = time.perf_counter() - start
@@ -0,0 +1,922 @@
+import math, multiprocessing, os, queue, threading, time
+import numpy as np
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from PIL import Image
+
+from support_func.cache import CacheStats, TileCache, image_nbytes, pyramids, renditions
+
+from typing_extensions import TypeAlias
+
+_size: TypeAlias = tuple[int, int]
+_loc: TypeAlias = tuple[int, int]
+_job: TypeAlias = tuple[str, str] # (file path of image, save path)
+
+grid_band_rows = 256 # rows of pixels in grid layer made at a time
+
+@dataclass(frozen=True)
+class RenderProfile():
+    """
+    resampling filters used for rendering, trading quality for speed.
+
+    Attributes:
+        name (str): name shown in GUI and timing.
+        resample (Image.Resampling): filter to shrink image, and to shrink watermark before the transform.
+        upscale (Image.Resampling): filter to enlarge image.
+        transform (Image.Resampling): filter to rotate and resize watermark in one affine transform,
+            pillow only supports NEAREST, BILINEAR and BICUBIC for it.
+        reducing_gap (float | None): resize by a whole factor first when shrinking more than this, 
+            see `Image.resize()`. None to resize in one step.
+    """
+    name: str
+    resample: Image.Resampling
+    transform: Image.Resampling
+    upscale: Image.Resampling
+    reducing_gap: float|None = None
+
+# canvas and slider updates, redrawn many times a second
+interactive = RenderProfile(
+    "interactive", Image.Resampling.BOX, Image.Resampling.BILINEAR, Image.Resampling.BILINEAR, reducing_gap=2.0
+    )
+# saved images
+export = RenderProfile("export", Image.Resampling.LANCZOS, Image.Resampling.BICUBIC, Image.Resampling.LANCZOS)
+profiles = {profile.name: profile for profile in (interactive, export)}
+
+class ProfileTiming():
+    """
+    how many renders each profile did in this process, and how long they took.
+
+    Example:
+     >>> import support_func as sf
+     >>> print(sf.profile_timing) # interactive: 12 renders, 0.8 ms average. export: ...
+
+    """
+    def __init__(self) -> None:
+        self.renders:dict[str, int] = {}
+        self.seconds:dict[str, float] = {}
+
+    def add(self, profile:RenderProfile, seconds:float) -> None:
+        self.renders[profile.name] = self.renders.get(profile.name, 0) + 1
+        self.seconds[profile.name] = self.seconds.get(profile.name, 0.0) + seconds
+
+    def __str__(self) -> str:
+        if not self.renders:
+            return "render profiles: nothing rendered."
+        return " ".join(
+            f"{name}: {count} renders, {self.seconds[name] / count * 1000:.1f} ms average." 
+            for name, count in self.renders.items()
+        )
+
+profile_timing = ProfileTiming()
+
+@dataclass(frozen=True)
+class MarkSpec():
+    """
+    a frozen copy of everything needed to put the watermark on a image,
+    taken from the GUI once, so images can be rendered without tkinter.
+    positions are recorded on canvas like user see it,
+    and mapped to every image by the same math the canvas uses.
+
+    Attributes:
+        mark (Image.Image): source of watermark in RGBA, before rotate and opacity.
+        mark_id (Hashable): identify content of `mark`, used as key of cached renditions,
+            None to skip cache.
+        angle (int): rotate angle of watermark in degrees.
+        alpha (int | None): opacity of watermark, range 0 ~ 255,
+            None to keep the alpha of `mark` as it is.
+        scale (float): scale of watermark requested by user.
+        grid (bool): repeat watermark all over the image.
+        grid_space (int): space between watermarks in grid, in canvas pixels.
+        position (tuple[int,int]): position user clicked on canvas.
+        mark_offset (tuple[int,int]): offset from clicked position to top left corner of watermark on canvas.
+        snap (tuple[float,float] | None): snap anchor, where watermark snapped to border of image,
+            relative to image size, 1 means right or bottom border. None if not snapped.
+        shift (tuple[int,int]): user adjustment of watermark position in output image.
+        canvas_size (tuple[int,int]): size of canvas.
+        canvas_pad (tuple[int,int]): blank border between canvas and image.
+        profile (RenderProfile): resampling filters to render with.
+    """
+    mark: Image.Image
+    mark_id: Hashable = None
+    angle: int = 0
+    alpha: int|None = None
+    scale: float = 1
+    grid: bool = False
+    grid_space: int = 0
+    position: _loc = (0, 0)
+    mark_offset: _loc = (0, 0)
+    snap: tuple[float, float]|None = None
+    shift: _loc = (0, 0)
+    canvas_size: _size = (0, 0)
+    canvas_pad: _size = (0, 0)
+    profile: RenderProfile = export
+
+def fit_size(width:int, height:int, bound:_size) -> _size:
+    """
+    scale width and height proportionally to fit in bound.
+
+    Args:
+        width (int): original width.
+        height (int): original height.
+        bound (tuple[int,int]): max width and height.
+
+    Returns:
+        tuple[int, int]: fitted width and height.
+    """
+    ratio = min(bound[0] / width, bound[1] / height)
+    return math.floor(width * ratio), math.floor(height * ratio)
+
+def pyramid_level(filepath:str, level:int) -> Image.Image:
+    """
+    image of filepath scaled down by 2**level, level 0 is full resolution.
+    levels are built when asked for, and cached in pyramids by (file path, modified time, level).
+    a level is reduced from the nearest finer level already cached,
+    only decoded from file if there's none, jpeg at reduced scale by draft mode.
+
+    Args:
+        filepath (str): file path of the image.
+        level (int): level of the pyramid, 0 or above.
+
+    Returns:
+        Image.Image: the level in RGBA, shared by cache, don't change it in place.
+    """
+    key = ("pyramid", filepath, os.path.getmtime(filepath))
+    
+    def make() -> Image.Image:
+        for finer in range(level - 1, -1, -1):
+            image = pyramids.peek((*key, finer))
+            if image is not None:
+                return image.reduce(2 ** (level - finer))
+        
+        with Image.open(filepath) as image:
+            full_width = image.width
+            # only jpeg supports draft, which decodes at the smallest scale still >= the level
+            image.draft("RGB", (math.ceil(image.width / 2**level), math.ceil(image.height / 2**level)))
+            decoded_level = round(math.log2(full_width / image.width))
+            decoded = image.convert("RGBA")
+        factor = 2 ** (level - decoded_level)
+        return decoded.reduce(factor) if factor > 1 else decoded
+    
+    return pyramids.get((*key, level), make)
+
+def fit_level(size:_size, bound:_size) -> int:
+    "coarsest pyramid level of image of size, that is still at least as large as size fitted in bound."
+    fitted = fit_size(*size, bound=bound)
+    ratio = min(size[0] / fitted[0], size[1] / fitted[1])
+    return max(0, math.floor(math.log2(ratio)))
+
+def load_preview(filepath:str, bound:_size, profile:RenderProfile=interactive) -> tuple[Image.Image, _size]:
+    """
+    load image from filepath scaled to fit in bound, for showing on canvas.
+    it's resized from the nearest level of the image pyramid, see `pyramid_level()`,
+    so showing the same image at another size only resamples a small image.
+
+    Args:
+        filepath (str): file path of the image.
+        bound (tuple[int,int]): max width and height of the preview.
+        profile (RenderProfile, optional): filters to resize with. Defaults to interactive.
+
+    Returns:
+        tuple[Image.Image, tuple[int,int]]: preview in RGBA, size of the full resolution image.
+    """
+    start = time.perf_counter()
+    with Image.open(filepath) as image:
+        full_size = image.size
+    size = fit_size(*full_size, bound=bound)
+    level = pyramid_level(filepath, fit_level(full_size, bound))
+    # BOX only averages, enlarging with it repeats pixels in blocks
+    resample = profile.resample if size[0] <= level.width else profile.upscale
+    preview = level.resize(size, resample, reducing_gap=profile.reducing_gap)
+    preview.putalpha(255)
+    profile_timing.add(profile, time.perf_counter() - start)
+    return preview, full_size
+
+class Prefetcher(CacheStats):
+    """
+    load previews of the next images in queue by `load_preview()` in a background thread, 
+    so showing the next image doesn't wait for decoding.
+    keeps at most depth previews, and no more than max_bytes of them.
+
+    Example:
+     >>> import support_func as sf
+     >>> prefetcher = sf.Prefetcher(depth=2)
+     >>> prefetcher.want(next_paths, bound)
+     >>> ready = prefetcher.take(path, bound) # (preview, full size) or None if not loaded yet
+
+    """
+    name = "prefetch"
+
+    def __init__(self, depth:int=2, max_bytes:int=64 * 2**20) -> None:
+        """
+        Args:
+            depth (int, optional): how many images ahead are loaded. Defaults to 2.
+            max_bytes (int, optional): max total size of loaded previews. Defaults to 64 MB.
+        """
+        super().__init__()
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.wanted:list[tuple[str, _size]] = []
+        self.ready:OrderedDict[tuple[str, _size], tuple[Image.Image, _size]] = OrderedDict()
+        self.nbytes = 0
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def want(self, filepaths:list[str], bound:_size) -> None:
+        """
+        load previews of the first `depth` of filepaths, fitted in bound, 
+        previews loaded before and no longer wanted are dropped.
+        """
+        with self.lock:
+            self.wanted = [(filepath, bound) for filepath in filepaths[:self.depth]]
+            for key in list(self.ready):
+                if key not in self.wanted:
+                    self.drop(key)
+        self.wake.set()
+
+    def take(self, filepath:str, bound:_size) -> tuple[Image.Image, _size]|None:
+        "loaded (preview, full size) of filepath fitted in bound, None if it's not loaded yet."
+        with self.lock:
+            if (filepath, bound) in self.ready:
+                self.hits += 1
+                return self.drop((filepath, bound))
+            self.misses += 1
+            return None
+
+    def drop(self, key:tuple[str, _size]) -> tuple[Image.Image, _size]:
+        loaded = self.ready.pop(key)
+        self.nbytes -= image_nbytes(loaded[0])
+        return loaded
+
+    def run(self) -> None:
+        while not self.closed:
+            self.wake.wait()
+            with self.lock:
+                self.wake.clear()
+                todo = [key for key in self.wanted if key not in self.ready]
+            for key in todo:
+                if self.closed or self.nbytes >= self.max_bytes:
+                    break
+                try:
+                    loaded = load_preview(*key)
+                except Exception:
+                    # not readable, let the GUI report it when it's shown
+                    continue
+                with self.lock:
+                    if key in self.wanted and self.nbytes + image_nbytes(loaded[0]) <= self.max_bytes:
+                        self.ready[key] = loaded
+                        self.nbytes += image_nbytes(loaded[0])
+
+    def close(self) -> None:
+        self.closed = True
+        self.wake.set()
+
+    def __str__(self) -> str:
+        return f"{self.name}: {self.hits} hits, {self.misses} misses, {self.hit_rate:.0%} hit rate, {len(self.ready)} loaded."
+
+def preview_geometry(size:_size, spec:MarkSpec) -> tuple[_loc, tuple[float, float]]:
+    """
+    where the image would be shown on canvas, and how much it's scaled down.
+
+    Args:
+        size (tuple[int,int]): size of the full resolution image.
+        spec (MarkSpec): spec of watermark, provides canvas size and padding.
+
+    Returns:
+        tuple[tuple[int,int], tuple[float,float]]: (datum_x, datum_y), (width_scale, height_scale)
+    """
+    canvas_w, canvas_h = spec.canvas_size
+    pad_x, pad_y = spec.canvas_pad
+    shown_w, shown_h = fit_size(*size, bound=(canvas_w - pad_x * 2, canvas_h - pad_y * 2))
+    datum = math.floor((canvas_w - shown_w) / 2), math.floor((canvas_h - shown_h) / 2)
+    scale = size[0] / shown_w, size[1] / shown_h
+    return datum, scale
+
+def rotation(size:_size, angle:float) -> tuple[list[float], _size]:
+    """
+    affine matrix and expanded size of `rotate(angle, expand=True)`, 
+    the matrix maps output pixel to source pixel, the same one pillow builds.
+
+    Args:
+        size (tuple[int,int]): size of source.
+        angle (float): rotate angle in degrees, counter clockwise.
+
+    Returns:
+        tuple[list[float], tuple[int,int]]: (matrix, rotated size)
+    """
+    width, height = size
+    rad = -math.radians(angle % 360)
+    cos, sin = round(math.cos(rad), 15), round(math.sin(rad), 15)
+    # rotate around center of source
+    center_x, center_y = width / 2, height / 2
+    shift_x = -cos * center_x - sin * center_y + center_x
+    shift_y = sin * center_x - cos * center_y + center_y
+    corners = [
+        (cos * x + sin * y + shift_x, -sin * x + cos * y + shift_y) 
+        for x, y in ((0, 0), (width, 0), (width, height), (0, height))
+        ]
+    xs, ys = [x for x, _ in corners], [y for _, y in corners]
+    if angle % 180 == 0:
+        rotated = width, height
+    elif angle % 90 == 0:
+        rotated = height, width
+    else:
+        rotated = (
+            math.ceil(max(xs)) - math.floor(min(xs)), 
+            math.ceil(max(ys)) - math.floor(min(ys)), 
+        )
+    # then center it in the rotated size
+    x, y = -(rotated[0] - width) / 2, -(rotated[1] - height) / 2
+    matrix = [cos, sin, cos * x + sin * y + shift_x, -sin, cos, -sin * x + cos * y + shift_y]
+    return matrix, rotated
+
+def rotated_size(size:_size, angle:float) -> _size:
+    "exact size of source of size after `rotate(angle, expand=True)`, without rotating it."
+    return rotation(size, angle)[1]
+
+def faded(source:Image.Image, source_id:Hashable, alpha:int|None) -> Image.Image:
+    """
+    multiply alpha of source by opacity, so soft edges of watermark stay soft,
+    cached in renditions by (source_id, alpha).
+
+    Args:
+        source (Image.Image): source of watermark in RGBA.
+        source_id (Hashable): identify content of source, None to skip cache.
+        alpha (int | None): opacity, range 0 ~ 255, None or 255 to keep alpha of source.
+
+    Returns:
+        Image.Image: the faded source, shared by cache, don't change it in place.
+    """
+    if alpha is None or alpha == 255:
+        return source
+    
+    def make() -> Image.Image:
+        pixels = np.array(source)
+        # fixed point alpha * opacity / 255, rounded
+        pixels[..., 3] = (pixels[..., 3].astype(np.uint16) * alpha + 127) // 255
+        return Image.fromarray(pixels, "RGBA")
+    
+    if source_id is None:
+        return make()
+    return renditions.get(("opacity", source_id, alpha), make)
+
+def transformed(
+    source:Image.Image, 
+    source_id:Hashable, 
+    *, 
+    angle:int=0, 
+    alpha:int|None=None, 
+    size:_size|None=None, 
+    profile:RenderProfile=export, 
+    ) -> Image.Image:
+    """
+    apply opacity by `faded()`, rotate and resize to the source watermark,
+    renditions are cached by (source_id, angle, alpha, size, profile name).
+    rotate and resize are one affine transform, source is resampled once for each rendition.
+
+    Args:
+        source (Image.Image): source of watermark in RGBA.
+        source_id (Hashable): identify content of source, None to skip cache.
+        angle (int, optional): rotate angle in degrees. Defaults to 0.
+        alpha (int | None, optional): opacity, range 0 ~ 255, None to keep alpha of source. Defaults to None.
+        size (tuple[int,int] | None, optional): resize to size after rotate, None to keep rotated size. Defaults to None.
+        profile (RenderProfile, optional): filters to shrink and transform with. Defaults to export.
+
+    Returns:
+        Image.Image: the rendition, shared by cache, don't change it in place.
+    """
+    def make() -> Image.Image:
+        start = time.perf_counter()
+        mark = faded(source, source_id, alpha)
+        matrix, rotated = rotation(mark.size, angle)
+        out_size = size or rotated
+        scale_x, scale_y = out_size[0] / rotated[0], out_size[1] / rotated[1]
+        matrix = [
+            matrix[0] / scale_x, matrix[1] / scale_y, matrix[2], 
+            matrix[3] / scale_x, matrix[4] / scale_y, matrix[5], 
+            ]
+        # interpolation alone skips source pixels when shrinking a lot,
+        # shrink by the whole factor first with filter of profile, coordinates shrink with the source
+        factor = int(1 / max(scale_x, scale_y))
+        if factor >= 2:
+            reduced = math.ceil(mark.width / factor), math.ceil(mark.height / factor)
+            shrink_x, shrink_y = mark.width / reduced[0], mark.height / reduced[1]
+            mark = mark.resize(reduced, profile.resample, reducing_gap=profile.reducing_gap)
+            matrix = [value / shrink_x for value in matrix[:3]] + [value / shrink_y for value in matrix[3:]]
+        # transparent border, so edges are interpolated with it instead of cut off
+        padded = Image.new("RGBA", (mark.width + 2, mark.height + 2))
+        padded.paste(mark, (1, 1))
+        matrix[2] += 1
+        matrix[5] += 1
+        mark = padded.transform(out_size, Image.Transform.AFFINE, matrix, resample=profile.transform)
+        profile_timing.add(profile, time.perf_counter() - start)
+        return mark
+    
+    if source_id is None:
+        return make()
+    return renditions.get((source_id, angle, alpha, size, profile.name), make)
+
+def prepare_mark(spec:MarkSpec) -> Image.Image:
+    """
+    apply opacity, rotate and scale of spec to the source watermark.
+    """
+    rotated = rotated_size(spec.mark.size, spec.angle)
+    width = round(np.round(rotated[0] * spec.scale))
+    height = round(np.round(rotated[1] * spec.scale))
+    return transformed(
+        spec.mark, spec.mark_id, angle=spec.angle, alpha=spec.alpha, size=(width, height), profile=spec.profile
+        )
+
+def mark_position(size:_size, mark_size:_size, spec:MarkSpec) -> _loc:
+    """
+    calculate top left corner of watermark in image.
+
+    Args:
+        size (tuple[int,int]): size of the full resolution image.
+        mark_size (tuple[int,int]): size of the prepared watermark.
+        spec (MarkSpec): spec of watermark.
+
+    Returns:
+        tuple[int, int]: x, y of watermark in image.
+    """
+    shift_h, shift_v = spec.shift
+    if spec.snap:
+        x = round(spec.snap[0] * size[0])
+        y = round(spec.snap[1] * size[1])
+        if spec.snap[0] == 1:
+            x -= mark_size[0] + shift_h
+        if spec.snap[1] == 1:
+            y -= mark_size[1] + shift_v
+    else:
+        datum, scale = preview_geometry(size, spec)
+        true_x = spec.position[0] - spec.mark_offset[0] - datum[0]
+        true_y = spec.position[1] - spec.mark_offset[1] - datum[1]
+        x = round(np.round(true_x * scale[0])) + shift_h
+        y = round(np.round(true_y * scale[1])) + shift_v
+    return x, y
+
+def grid_origin(x:int, step:int) -> int:
+    """
+    first location of grid along one axis, aligned with x, at or before 0.
+    """
+    if x != 0:
+        return x - (x // step + 1) * step
+    return 0
+
+def grid_locations(x:int, y:int, step:int, x_max:int, y_max:int) -> dict[str, list[int]]:
+    """
+    every location of watermark in grid, aligned with (x, y).
+
+    Args:
+        x (int): x of one of the watermark.
+        y (int): y of one of the watermark.
+        step (int): distance between top left corner of watermarks.
+        x_max (int): stop before this x.
+        y_max (int): stop before this y.
+
+    Returns:
+        dict[str, list[int]]: {"x": [...], "y": [...]}
+    """
+    return {
+        "x": list(range(grid_origin(x, step), x_max, step)),
+        "y": list(range(grid_origin(y, step), y_max, step)),
+    }
+
+def grid_step(size:_size, mark:Image.Image, spec:MarkSpec) -> int:
+    "distance between watermarks in grid, in image pixels."
+    _, scale = preview_geometry(size, spec)
+    grid_scale = min(scale)
+    return max(mark.width, mark.height) + round(spec.grid_space * grid_scale)
+
+def tile_grid(size:_size, x:int, y:int, step:int, mark:Image.Image) -> Image.Image:
+    """
+    create a layer of size with watermark repeated every step pixels, aligned with (x, y).
+    one tile (watermark and the space after it) is built, 
+    and repeated over the layer by numpy instead of pasting every watermark.
+
+    Args:
+        size (tuple[int,int]): size of the layer.
+        x (int): x of one of the watermark.
+        y (int): y of one of the watermark.
+        step (int): distance between top left corner of watermarks.
+        mark (Image.Image): watermark in RGBA.
+
+    Returns:
+        Image.Image: layer of watermarks.
+    """
+    width, height = size
+    if step < max(mark.size):
+        # watermarks overlap, later ones cover the earlier ones
+        base = Image.new("RGBA", size)
+        locs = grid_locations(x, y, step, width + step, height + step)
+        for x_loc in locs["x"]:
+            for y_loc in locs["y"]:
+                base.paste(im=mark, box=(x_loc, y_loc))
+        return base
+    
+    tile = np.zeros((step, step, 4), dtype=np.uint8)
+    tile[:mark.height, :mark.width] = np.asarray(mark)
+    
+    # roll the tile so pixel (0, 0) of the layer is at top left of the tile,
+    # then wrap it over the layer, only the layer itself is allocated
+    offset_x = -grid_origin(x, step) % step
+    offset_y = -grid_origin(y, step) % step
+    tile = np.roll(tile, (-offset_y, -offset_x), axis=(0, 1))[:height, :width]
+    pad = ((0, height - tile.shape[0]), (0, width - tile.shape[1]), (0, 0))
+    layer = np.pad(tile, pad, mode="wrap")
+    return Image.fromarray(layer, "RGBA")
+
+def grid_layer(size:_size, x:int, y:int, step:int, mark:Image.Image, mark_id:Hashable) -> Image.Image:
+    """
+    same layer as `tile_grid()`, for preview that moves with the mouse.
+    a layer one step larger is cached in renditions by (mark_id, step, size),
+    moving the grid only crops it at another place.
+
+    Args:
+        size (tuple[int,int]): size of the layer.
+        x (int): x of one of the watermark.
+        y (int): y of one of the watermark.
+        step (int): distance between top left corner of watermarks.
+        mark (Image.Image): watermark in RGBA.
+        mark_id (Hashable): identify content of `mark`.
+
+    Returns:
+        Image.Image: layer of watermarks.
+    """
+    width, height = size
+    key = ("grid layer", mark_id, step, size)
+    # watermarks of the larger layer are at multiples of step, origin at -step covers watermark before 0
+    larger = renditions.get(key, lambda: tile_grid((width + step, height + step), step, step, step, mark))
+    left, top = -x % step, -y % step
+    return larger.crop((left, top, left + width, top + height))
+
+def paste_grid(image:Image.Image, x:int, y:int, mark:Image.Image, spec:MarkSpec) -> None:
+    """
+    paste watermark repeated in grid onto image in place.
+    the grid layer is made in bands of rows, so it never takes a image-sized layer.
+
+    Args:
+        image (Image.Image): the image to put watermark on, changed in place.
+        x (int): x of the watermark user placed.
+        y (int): y of the watermark user placed.
+        mark (Image.Image): prepared watermark.
+        spec (MarkSpec): spec of watermark.
+    """
+    width, height = image.size
+    step = grid_step(image.size, mark, spec)
+    for top in range(0, height, grid_band_rows):
+        band_height = min(grid_band_rows, height - top)
+        band = tile_grid((width, band_height), x, y - top, step, mark)
+        image.paste(band, (0, top), band)
+
+def render(filepath:str, spec:MarkSpec) -> Image.Image:
+    """
+    load image from filepath and put watermark on it as described by spec.
+    watermark is pasted straight into the decoded image, no full size copy is made,
+    RGBA image comes out opaque like it's shown on canvas.
+
+    Args:
+        filepath (str): file path of the image.
+        spec (MarkSpec): spec of watermark.
+
+    Returns:
+        Image.Image: the watermarked image, in RGB or RGBA.
+    """
+    image = Image.open(filepath)
+    if image.mode in ("RGB", "RGBA"):
+        image.load()
+    else:
+        image = image.convert("RGB")
+
+    mark = prepare_mark(spec)
+    x, y = mark_position(image.size, mark.size, spec)
+    if spec.grid:
+        paste_grid(image, x, y, mark, spec)
+    else:
+        image.paste(mark, (x, y), mark)
+    if image.mode == "RGBA":
+        image.putalpha(255)
+    return image
+
+def render_to_file(filepath:str, save_path:str, spec:MarkSpec) -> None:
+    """
+    render watermarked image and save it to save_path.
+
+    Args:
+        filepath (str): file path of the image.
+        save_path (str): file path to save the result.
+        spec (MarkSpec): spec of watermark.
+    """
+    image = render(filepath, spec)
+    if image.mode == "RGBA" and not save_path.lower().endswith(".png"):
+        # jpeg can't store alpha channel
+        image = image.convert("RGB")
+    image.save(save_path)
+
+class SaveQueue():
+    """
+    render and save images with `render_to_file()` in a background thread, one after another,
+    so saving doesn't freeze the GUI. 
+    at most max_pending saves wait in queue, `submit()` waits for room when it's full.
+
+    Example:
+     >>> import support_func as sf
+     >>> saves = sf.SaveQueue(max_pending=4)
+     >>> saves.submit(filepath, save_path, spec)
+     >>> print(saves.pending, saves.take_errors())
+     >>> saves.flush() # before exit
+
+    """
+    def __init__(self, max_pending:int=4) -> None:
+        """
+        Args:
+            max_pending (int, optional): max saves waiting in queue. Defaults to 4.
+        """
+        self.jobs:queue.Queue[tuple[str, str, MarkSpec]] = queue.Queue(maxsize=max_pending)
+        self.errors:list[tuple[str, str]] = []
+        self.lock = threading.Lock()
+        self.saved = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    @property
+    def pending(self) -> int:
+        "saves submitted and not finished yet."
+        return self.jobs.unfinished_tasks
+
+    def submit(self, filepath:str, save_path:str, spec:MarkSpec) -> None:
+        "queue a save, same arguments as `render_to_file()`."
+        self.jobs.put((filepath, save_path, spec))
+
+    def take_errors(self) -> list[tuple[str, str]]:
+        "(save path, error) of saves failed since last call."
+        with self.lock:
+            errors, self.errors = self.errors, []
+        return errors
+
+    def run(self) -> None:
+        while True:
+            filepath, save_path, spec = self.jobs.get()
+            try:
+                render_to_file(filepath, save_path, spec)
+            except Exception as error:
+                with self.lock:
+                    self.errors.append((save_path, str(error)))
+            else:
+                self.saved += 1
+            finally:
+                self.jobs.task_done()
+
+    def flush(self) -> None:
+        "wait until every submitted save is finished."
+        self.jobs.join()
+
+class TileRenderer():
+    """
+    watermarked image cut into square tiles at each pyramid level, for zoom and pan.
+    only tiles asked for are decoded and composited, the latest ones are kept in a TileCache.
+    full resolution image is loaded when level 0 is first asked for, and kept until `close()`.
+
+    Example:
+     >>> import support_func as sf
+     >>> viewer = sf.TileRenderer(filepath, spec)
+     >>> tile = viewer.tile(level=0, col=3, row=2) # at 100%
+     >>> viewer.close()
+
+    """
+    def __init__(self, filepath:str, spec:MarkSpec|None, tile_size:int=256, max_tiles:int=256) -> None:
+        """
+        Args:
+            filepath (str): file path of the image.
+            spec (MarkSpec | None): spec of watermark, None to show the image only.
+            tile_size (int, optional): width and height of tiles. Defaults to 256.
+            max_tiles (int, optional): how many tiles are kept. Defaults to 256.
+        """
+        self.filepath = filepath
+        self.spec = spec
+        self.tile_size = tile_size
+        with Image.open(filepath) as image:
+            self.size:_size = image.size
+        self.full:Image.Image|None = None
+        self.tiles = TileCache(max_tiles)
+        self.marks:dict[int, tuple[Image.Image, _loc, int]] = {}
+
+    def level_size(self, level:int) -> _size:
+        "size of the image at level."
+        return math.ceil(self.size[0] / 2**level), math.ceil(self.size[1] / 2**level)
+
+    @property
+    def max_level(self) -> int:
+        "coarsest level worth showing, where the whole image fits in one tile."
+        return max(0, math.ceil(math.log2(max(self.size) / self.tile_size)))
+
+    def level_image(self, level:int) -> Image.Image:
+        if level > 0:
+            return pyramid_level(self.filepath, level)
+        if self.full is None:
+            image = Image.open(self.filepath)
+            if image.mode in ("RGB", "RGBA"):
+                image.load()
+            else:
+                image = image.convert("RGB")
+            self.full = image
+        return self.full
+
+    def level_mark(self, level:int) -> tuple[Image.Image, _loc, int]:
+        "watermark, its position and grid step at level, scaled from full resolution."
+        if level not in self.marks:
+            spec:MarkSpec = self.spec # type: ignore
+            mark = prepare_mark(spec)
+            x, y = mark_position(self.size, mark.size, spec)
+            step = grid_step(self.size, mark, spec)
+            if level > 0:
+                scale = 2**level
+                size = max(1, round(mark.width / scale)), max(1, round(mark.height / scale))
+                mark = transformed(
+                    spec.mark, spec.mark_id, angle=spec.angle, alpha=spec.alpha, size=size, profile=spec.profile
+                    )
+                x, y, step = round(x / scale), round(y / scale), max(1, round(step / scale))
+            self.marks[level] = mark, (x, y), step
+        return self.marks[level]
+
+    def tile(self, level:int, col:int, row:int) -> Image.Image:
+        """
+        composited tile at col and row of level, in RGBA.
+
+        Args:
+            level (int): level of the pyramid, 0 is full resolution.
+            col (int): column of the tile, from left.
+            row (int): row of the tile, from top.
+
+        Returns:
+            Image.Image: the tile, smaller at right and bottom border of image, shared by cache.
+        """
+        return self.tiles.get((level, col, row), lambda: self.make_tile(level, col, row))
+
+    def make_tile(self, level:int, col:int, row:int) -> Image.Image:
+        image = self.level_image(level)
+        left, top = col * self.tile_size, row * self.tile_size
+        box = left, top, min(left + self.tile_size, image.width), min(top + self.tile_size, image.height)
+        tile = image.crop(box).convert("RGBA")
+        if self.spec is not None:
+            mark, (x, y), step = self.level_mark(level)
+            if self.spec.grid:
+                layer = tile_grid(tile.size, x - left, y - top, step, mark)
+                tile.paste(layer, (0, 0), layer)
+            else:
+                tile.paste(mark, (x - left, y - top), mark)
+        tile.putalpha(255)
+        return tile
+
+    def set_spec(self, spec:MarkSpec|None) -> None:
+        "show the image with another watermark, tiles are made again while the decoded image is kept."
+        self.spec = spec
+        self.marks.clear()
+        self.tiles.clear()
+
+    def close(self) -> None:
+        "let go of full resolution image and tiles."
+        self.full = None
+        self.tiles.clear()
+
+class BatchReport():
+    """
+    counts and timing of a batch of images rendered by `render_batch()`,
+    safe to read from another thread while the batch is running.
+    """
+    def __init__(self, total:int, profile:RenderProfile=export) -> None:
+        self.total = total
+        self.profile = profile
+        self.done = 0
+        self.errors:list[tuple[str, str]] = []
+        self.cancelled = False
+        self.start = time.perf_counter()
+        self.end:float|None = None
+        
+    def finish(self, job:_job, error:BaseException|None=None) -> None:
+        "record one image as done, failed or not."
+        self.done += 1
+        if error is not None:
+            self.errors.append((job[0], str(error)))
+    
+    def close(self) -> None:
+        "stop the clock, no more images will be done."
+        self.end = time.perf_counter()
+    
+    @property
+    def elapsed(self) -> float:
+        "seconds since batch started, until it's closed."
+        end = self.end if self.end is not None else time.perf_counter()
+        return end - self.start
+    
+    @property
+    def rate(self) -> float:
+        "images per second."
+        elapsed = self.elapsed
+        if elapsed == 0:
+            return 0.0
+        return self.done / elapsed
+    
+    @property
+    def eta(self) -> float|None:
+        "estimated seconds left, None before the first image is done."
+        rate = self.rate
+        if rate == 0:
+            return None
+        return (self.total - self.done) / rate
+    
+    def __str__(self) -> str:
+        state = "cancelled, " if self.cancelled else ""
+        return (
+            f"{state}{self.done}/{self.total} images in {self.elapsed:.1f}s, {self.rate:.1f} images/sec, "
+            f"{self.profile.name} profile."
+        )
+
+# spec of the batch in worker process, sent once when the worker starts
+_worker_spec:MarkSpec|None = None
+
+def _init_worker(spec:MarkSpec) -> None:
+    global _worker_spec
+    _worker_spec = spec
+
+def _render_job(filepath:str, save_path:str) -> None:
+    render_to_file(filepath, save_path, _worker_spec) # type: ignore
+
+def render_batch(
+    jobs:list[_job], 
+    spec:MarkSpec, 
+    *, 
+    workers:int=1, 
+    report:BatchReport|None=None, 
+    cancel:threading.Event|None=None, 
+    ) -> BatchReport:
+    """
+    render every job with the same spec, spread across a process pool.
+    save paths are decided by caller before hand, 
+    so output names won't depend on which image finishes first.
+    can be run in a thread, and cancelled between images.
+
+    Args:
+        jobs (list[tuple[str,str]]): (file path of image, save path) of each image.
+        spec (MarkSpec): spec of watermark.
+        workers (int, optional): number of worker processes, 
+            1 to render in current process. Defaults to 1.
+        report (BatchReport | None, optional): report to update while rendering,
+            for reading progress from other thread. Defaults to None.
+        cancel (threading.Event | None, optional): set to stop before the next image, 
+            images already rendering will still be saved. Defaults to None.
+
+    Returns:
+        BatchReport: counts, errors and images/sec of the batch.
+    """
+    if report is None:
+        report = BatchReport(total=len(jobs), profile=spec.profile)
+    if cancel is None:
+        cancel = threading.Event()
+    
+    if workers <= 1:
+        _init_worker(spec)
+        for job in jobs:
+            if cancel.is_set():
+                break
+            try:
+                _render_job(*job)
+            except Exception as error:
+                report.finish(job, error)
+            else:
+                report.finish(job)
+    else:
+        # only keep a few jobs queued per worker instead of submitting everything at once,
+        # so cancel don't have to wait for the whole folder
+        queued = iter(jobs)
+        # spawn instead of fork, forking while another thread holds a lock like renditions.lock
+        # leaves the lock held forever in the child
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn"), 
+            initializer=_init_worker, initargs=(spec,), 
+            )
+        with executor:
+            pending = {}
+            while True:
+                while len(pending) < workers * 2 and not cancel.is_set():
+                    job = next(queued, None)
+                    if job is None:
+                        break
+                    pending[executor.submit(_render_job, *job)] = job
+                if cancel.is_set():
+                    for future in list(pending):
+                        if future.cancel():
+                            pending.pop(future)
+                if not pending:
+                    break
+                finished, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    report.finish(pending.pop(future), future.exception())
+    report.cancelled = cancel.is_set() and report.done < report.total
+    report.close()
+    return report
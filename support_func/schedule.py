@@ -0,0 +1,166 @@
+import math, time
+import tkinter as tk
+
+from collections import deque
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing_extensions import TypeAlias
+
+_callable: TypeAlias = Callable[[], object]
+
+class RenderScheduler():
+    """
+    collect requests to re-render the watermark, and run each requested
+    render function once when tkinter is idle, at most once per frame.
+    requests made in between are coalesced into that one render.
+
+    Example:
+     >>> import support_func as sf
+     >>> scheduler = sf.RenderScheduler(window)
+     >>> scale = tk.Scale(..., command=scheduler.wrap(foo))
+     >>> scheduler.request(foo) # foo runs once, after the scale is done
+
+    - set many values, render once:
+     >>> with scheduler.transaction(foo):
+     >>>     var_a.set(1)
+     >>>     var_b.set(2)
+
+    """
+    def __init__(self, widget:tk.Misc, frame_ms:int=16) -> None:
+        """
+        Args:
+            widget (tk.Misc): any widget, used to schedule with `after_idle()` and `after()`.
+            frame_ms (int, optional): minimum milliseconds between two renders. Defaults to 16.
+        """
+        self.widget = widget
+        self.frame_ms = frame_ms
+        self.dirty:dict[_callable, None] = {} # ordered set of requested render functions
+        self.pending:str|None = None
+        self.last_render = 0.0
+        self.depth = 0 # how many transactions are open
+        self.commits:dict[_callable, None] = {}
+
+        self.requests = 0
+        self.renders = 0
+        self.waiting = 0
+        self.last_coalesced = 0
+        self.max_coalesced = 0
+
+    def request(self, func:_callable) -> None:
+        """
+        mark func to be called in the next render.
+
+        Args:
+            func (Callable[[], object]): the render function, called without arguments.
+        """
+        self.requests += 1
+        self.waiting += 1
+        if self.depth:
+            # held by transaction, the transaction renders once when it ends
+            return
+        self.dirty[func] = None
+        if self.pending is not None:
+            return
+        wait_ms = self.frame_ms - round((time.perf_counter() - self.last_render) * 1000)
+        if wait_ms > 0:
+            self.pending = self.widget.after(wait_ms, self.flush)
+        else:
+            self.pending = self.widget.after_idle(self.flush)
+
+    def wrap(self, func:_callable) -> Callable[..., None]:
+        """
+        wrap func as a widget command or event callback,
+        calling it requests a render instead of rendering right away.
+        """
+        return lambda *args: self.request(func)
+
+    @contextmanager
+    def transaction(self, func:_callable) -> Iterator[None]:
+        """
+        hold every render requested inside, call func once when the outermost transaction ends,
+        together with renders requested before the transaction.
+
+        Args:
+            func (Callable[[], object]): the render function that covers every change inside.
+        """
+        self.depth += 1
+        self.commits[func] = None
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            if self.depth == 0:
+                self.dirty.update(self.commits)
+                self.commits.clear()
+                self.flush()
+
+    def flush(self) -> None:
+        "run every requested render function now."
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+            self.pending = None
+        if not self.dirty:
+            return
+
+        funcs = list(self.dirty)
+        self.dirty.clear()
+        self.last_coalesced = self.waiting
+        self.max_coalesced = max(self.max_coalesced, self.waiting)
+        self.waiting = 0
+        self.renders += 1
+        # one failing render function doesn't drop the others, its error is raised after all of them ran
+        error:Exception|None = None
+        try:
+            for func in funcs:
+                try:
+                    func()
+                except Exception as exc:
+                    if error is None:
+                        error = exc
+        finally:
+            self.last_render = time.perf_counter()
+        if error is not None:
+            raise error
+
+    def __str__(self) -> str:
+        return (
+            f"renders: {self.renders} renders for {self.requests} requests, "
+            f"last render coalesced {self.last_coalesced}, most coalesced {self.max_coalesced}."
+        )
+
+class LatencyLog():
+    """
+    keep the latest latencies, and report their percentiles.
+
+    Example:
+     >>> import support_func as sf
+     >>> log = sf.LatencyLog("motion to paint")
+     >>> log.record(time.perf_counter() - start)
+     >>> print(log) # motion to paint: p50 3.1 ms, p95 6.0 ms, p99 9.4 ms, of last 120 samples.
+
+    """
+    def __init__(self, name:str, keep:int=1000) -> None:
+        """
+        Args:
+            name (str): what is measured, shown when printed.
+            keep (int, optional): how many of the latest latencies are kept. Defaults to 1000.
+        """
+        self.name = name
+        self.samples:deque[float] = deque(maxlen=keep)
+        self.count = 0
+
+    def record(self, seconds:float) -> None:
+        self.samples.append(seconds)
+        self.count += 1
+
+    def percentile(self, percent:float) -> float:
+        "latency in milliseconds that percent of kept samples are at or below, 0 if none is recorded."
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        idx = min(len(ordered) - 1, math.ceil(len(ordered) * percent / 100) - 1)
+        return ordered[max(idx, 0)] * 1000
+
+    def __str__(self) -> str:
+        p50, p95, p99 = (self.percentile(percent) for percent in (50, 95, 99))
+        return f"{self.name}: p50 {p50:.1f} ms, p95 {p95:.1f} ms, p99 {p99:.1f} ms, of last {len(self.samples)} samples."
@@ -0,0 +1,44 @@
+from PIL import Image, ImageTk
+
+class PhotoSurfaces():
+    """
+    one PhotoImage for each role shown in tkinter, like image, watermark or grid layer.
+    new pixels are pasted into the same PhotoImage,
+    a new one is only created when size of the role changes.
+
+    Example:
+     >>> import support_func as sf
+     >>> surfaces = sf.PhotoSurfaces()
+     >>> photo = surfaces.show("mark", image)
+     >>> canvas.create_image(x, y, image=photo) # shows later pastes too
+     >>> print(surfaces)
+
+    """
+    def __init__(self) -> None:
+        self.photos:dict[str, ImageTk.PhotoImage] = {}
+        self.allocated = 0
+        self.reused = 0
+
+    def show(self, role:str, image:Image.Image) -> ImageTk.PhotoImage:
+        """
+        put image in the PhotoImage of role.
+
+        Args:
+            role (str): what the PhotoImage is used for.
+            image (Image.Image): the new pixels.
+
+        Returns:
+            ImageTk.PhotoImage: PhotoImage of role, the same one as last time if size is unchanged.
+        """
+        photo = self.photos.get(role)
+        if photo is not None and (photo.width(), photo.height()) == image.size:
+            photo.paste(image)
+            self.reused += 1
+            return photo
+
+        photo = self.photos[role] = ImageTk.PhotoImage(image)
+        self.allocated += 1
+        return photo
+
+    def __str__(self) -> str:
+        return f"photo images: {self.allocated} allocated, {self.reused} allocations avoided by pasting in place."
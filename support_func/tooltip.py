@@ -4,8 +4,6 @@ import numpy as np
 from typing import Literal
 from typing_extensions import TypeAlias
 from collections.abc import Callable
-from matplotlib import font_manager
-from PIL import ImageFont
 
 _callable: TypeAlias = Callable
 _side: TypeAlias = Literal["tl", "tr", "bl", "br", "t", "b"] # topleft, bottomright etc.
@@ -152,58 +150,6 @@ class TipManager():
         "hide tooltip when mouse left."
         self.toolTip.hidetip()
 
-def get_sysfont_sorted() -> dict[str, dict[str, str]]:
-    """
-    get every font's name, filename, weight in path: C:/Windows/Fonts into a dict,
-    change the names of some(commonly used) Chinese-supported(zh-TW) fonts to Chinese.
-    
-    #! this function assumes any font file only correspond with a unique style with the same font name.
-    #! this function is not suitable for more then one correspond between style and file.
-    
-    C:/Windows/Fonts:
-    ├──file_1.ttf    # font name:a, style: 1
-    ├──file_2.ttf    # font name:a, style: 2
-    ├──file_3.ttf    # font name:a, style: 3
-    ├──file_4.ttf    # font name:a, style: 3
-    ├──file_5.ttf    # font name:b, style: 1
-    └──file_6.ttf    # font name:c, style: 2
-    └──file_7.ttf    # font name:c, style: 3
-    -> only file_3.ttf will be lost. 
-    # * only return the last file of the the same font name and style got looped by this function.
-    
-    Returns:
-        dict[str, dict[str, list[str]]]: {'font name': {'weight': ['...', ...], 'fname': 'file name', ...]}, ...}
-    """
-    sysfonts = font_manager.findSystemFonts()
-    fonts_dict:dict[str, dict[str, str]] = {}
-
-    # cite: https://en.wikipedia.org/wiki/List_of_typefaces_included_with_Microsoft_Windows
-    fname_table = {
-        'MingLiU': '新細明體',
-        "DFKai-SB": '標楷體',
-        'Microsoft JhengHei': '微軟正黑體',
-        'Microsoft YaHei': '微軟雅黑體',
-        'SimSun': '中易宋體',
-    }
-
-    # cite: https://stackoverflow.com/questions/75310650/how-to-get-font-path-from-font-name-python
-    for filepath in sysfonts: 
-        font = ImageFont.FreeTypeFont(filepath)
-        try:
-            name, style = font.getname()
-            assert name and style
-        except AssertionError:
-            continue
-        _, file_name = filepath.rsplit("\\", maxsplit=1)
-        if name in fname_table:
-            font_name = fname_table[name]
-        else:
-            font_name = name
-        if font_name not in fonts_dict.keys():
-            fonts_dict[font_name] = {}
-        fonts_dict[font_name][style] = file_name
-    return dict(fonts_dict.items())
-
 class CustomScale(tk.Scale):
     """
     A tk.Scale that set scale indicator to the middle, 